@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import Category, Location, Post
+from .search import get_search_backend
 
 
 @admin.register(Category)
@@ -32,6 +33,11 @@ class PostAdmin(admin.ModelAdmin):
             'fields': ('pub_date',), 'classes': ('collapse',)}),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return get_search_backend().search(queryset, search_term), False
+
 
 admin.site.site_header = 'Управление блогом'
 admin.site.site_title = 'Администрирование блога'
@@ -0,0 +1,324 @@
+from collections import Counter
+from datetime import datetime, timezone
+from functools import wraps
+from hashlib import md5
+from math import ceil
+from threading import Lock
+from time import monotonic, time, time_ns
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.db.models import Max, Min
+from django.utils.cache import patch_cache_control
+from django.utils.timezone import now
+from django.views.decorators.http import condition
+
+from .models import Category, Post, published_now
+
+PAGE_CACHE_VERSION_KEY = "page_cache:version"
+PAGE_CACHE_CHANGED_AT_KEY = "page_cache:changed_at"
+PAGE_CACHE_HITS_KEY = "page_cache:hits"
+PAGE_CACHE_MISSES_KEY = "page_cache:misses"
+PAGE_CACHE_QUERY_PARAMS = {"page", "cursor"}
+
+# slug -> (категория, момент устаревания по monotonic())
+_categories_by_slug = {}
+# Попадания и промахи, ещё не перенесённые этим процессом в общий кеш
+_pending_stats = Counter()
+_pending_stats_lock = Lock()
+
+
+def invalidate_post_cards(post_ids):
+    """Сбрасывает закешированные карточки публикаций.
+
+    Ключ карточки включает Post.updated_at, поэтому достаточно сдвинуть его
+    в базе: старые карточки перестанут находиться во всех процессах, а не
+    только в том, где произошло изменение. post_ids может быть выборкой.
+    """
+    Post.objects.filter(pk__in=post_ids).update(updated_at=now())
+
+
+def invalidate_posts(post_ids):
+    """Сбрасывает карточки публикаций и все закешированные страницы."""
+    invalidate_post_cards(post_ids)
+    bump_content_version()
+
+
+def get_category_by_slug(slug):
+    """Категория по slug из кеша процесса или None, если такой нет.
+
+    Кеш сбрасывается сигналами при изменении категорий; время жизни
+    BLOG_CATEGORY_CACHE_TIMEOUT ограничивает устаревание в других процессах.
+    """
+    cached = _categories_by_slug.get(slug)
+    if cached is not None and cached[1] > monotonic():
+        return cached[0]
+    category = Category.objects.filter(slug=slug).first()
+    if category is not None:
+        _categories_by_slug[slug] = (
+            category, monotonic() + settings.BLOG_CATEGORY_CACHE_TIMEOUT
+        )
+    return category
+
+
+def clear_category_cache():
+    _categories_by_slug.clear()
+
+
+def _version_key(key, scope):
+    return f"{key}:{scope}" if scope else key
+
+
+def get_content_version(scope=None):
+    """Версия контента: общая или, если задан scope, одной страницы.
+
+    scope — "index", "category:<slug>", "profile:<username>" или
+    "post:<id>"; общая версия меняется при любом изменении публикаций.
+    """
+    # При потере ключа версия начинается с текущего времени, чтобы
+    # не совпасть ни с одной из уже выданных.
+    key = _version_key(PAGE_CACHE_VERSION_KEY, scope)
+    if cache.add(key, time_ns(), None):
+        cache.set(_version_key(PAGE_CACHE_CHANGED_AT_KEY, scope), time(), None)
+    return cache.get(key)
+
+
+def get_content_changed_at(scope=None):
+    """Время последнего изменения контента или None, если оно неизвестно."""
+    keys = [PAGE_CACHE_CHANGED_AT_KEY]
+    if scope:
+        keys.append(_version_key(PAGE_CACHE_CHANGED_AT_KEY, scope))
+    changed_at = list(cache.get_many(keys).values())
+    if len(changed_at) < len(keys):
+        return None
+    return datetime.fromtimestamp(max(changed_at), tz=timezone.utc)
+
+
+def bump_content_version(*scopes):
+    """Сбрасывает закешированные страницы: все или только страниц scopes."""
+    changed_at = time()
+    for scope in scopes or (None,):
+        key = _version_key(PAGE_CACHE_VERSION_KEY, scope)
+        cache.set(_version_key(PAGE_CACHE_CHANGED_AT_KEY, scope), changed_at,
+                  None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            get_content_version(scope)
+
+
+def get_post_scopes(post_ids):
+    """Страницы, на которых видны посты post_ids: лента, категория, профиль.
+
+    Сами посты тоже входят: их страницы сбрасываются отдельно от лент.
+    """
+    scopes = {"index"}
+    for post_id, category_slug, username in Post.objects.filter(
+        pk__in=post_ids
+    ).order_by().values_list("pk", "category__slug", "author__username"):
+        scopes |= {f"post:{post_id}", f"profile:{username}"}
+        if category_slug:
+            scopes.add(f"category:{category_slug}")
+    return scopes
+
+
+def bump_post_versions(post_ids):
+    """Сбрасывает страницы постов post_ids и лент, где они видны."""
+    bump_content_version(*get_post_scopes(post_ids))
+
+
+def _get_page_scope(kwargs):
+    if "post_id" in kwargs:
+        return f"post:{kwargs['post_id']}"
+    if "category_slug" in kwargs:
+        return f"category:{kwargs['category_slug']}"
+    if "username" in kwargs:
+        return f"profile:{kwargs['username']}"
+    return "index"
+
+
+def _has_atomic_incr():
+    # У DatabaseCache и FileBasedCache incr — это чтение и запись, то есть
+    # лишний запрос к базе на каждой странице и потерянные приращения.
+    return isinstance(
+        caches[DEFAULT_CACHE_ALIAS], (BaseMemcachedCache, LocMemCache)
+    )
+
+
+def page_cache_stats():
+    shared = cache.get_many([PAGE_CACHE_HITS_KEY, PAGE_CACHE_MISSES_KEY])
+    with _pending_stats_lock:
+        hits = shared.get(PAGE_CACHE_HITS_KEY, 0) + _pending_stats[
+            PAGE_CACHE_HITS_KEY]
+        misses = shared.get(PAGE_CACHE_MISSES_KEY, 0) + _pending_stats[
+            PAGE_CACHE_MISSES_KEY]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / total if total else 0.0,
+    }
+
+
+def reset_page_cache_stats():
+    with _pending_stats_lock:
+        _pending_stats.clear()
+    cache.delete_many([PAGE_CACHE_HITS_KEY, PAGE_CACHE_MISSES_KEY])
+
+
+def _count(key):
+    """Учитывает попадание или промах.
+
+    Без атомарного incr счётчики копятся в процессе и переносятся в общий
+    кеш раз в BLOG_PAGE_CACHE_STATS_BATCH запросов.
+    """
+    with _pending_stats_lock:
+        _pending_stats[key] += 1
+        if (
+            not _has_atomic_incr()
+            and sum(_pending_stats.values())
+            < settings.BLOG_PAGE_CACHE_STATS_BATCH
+        ):
+            return
+        pending = dict(_pending_stats)
+        _pending_stats.clear()
+    for key, delta in pending.items():
+        if cache.add(key, delta, None):
+            continue
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            cache.add(key, delta, None)
+
+
+def _get_page_timeout():
+    """Время жизни страницы: не дольше, чем до выхода отложенного поста."""
+    timeout = settings.BLOG_PAGE_CACHE_TIMEOUT
+    next_pub_date = Post.objects.filter(
+        is_published=True, pub_date__gt=published_now()
+    ).aggregate(next_pub_date=Min("pub_date"))["next_pub_date"]
+    if next_pub_date is not None:
+        seconds = (next_pub_date - now()).total_seconds()
+        timeout = min(
+            timeout, ceil(seconds) + settings.BLOG_PUBLISHED_NOW_BUCKET
+        )
+    return max(timeout, 1)
+
+
+def _get_page_key(request, scope):
+    path = md5(request.path.encode()).hexdigest()
+    params = ":".join(
+        request.GET.get(param, "")
+        for param in sorted(PAGE_CACHE_QUERY_PARAMS)
+    )
+    versions = f"{get_content_version()}:{get_content_version(scope)}"
+    return f"page_cache:{versions}:{path}:{params}"
+
+
+def _is_cacheable(request):
+    return (
+        settings.BLOG_PAGE_CACHE_TIMEOUT
+        and request.method in ("GET", "HEAD")
+        and not request.user.is_authenticated
+        and set(request.GET) <= PAGE_CACHE_QUERY_PARAMS
+    )
+
+
+def anonymous_page_cache(view_func):
+    """Кеширует страницы целиком для анонимных посетителей.
+
+    Ключ зависит от пути, параметров ?page= / ?cursor=, общей версии
+    контента, которая увеличивается при любом изменении публикаций, и версии
+    самой ленты, которую сдвигают комментарии к её постам.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not _is_cacheable(request):
+            return view_func(request, *args, **kwargs)
+
+        key = _get_page_key(request, _get_page_scope(kwargs))
+        response = cache.get(key)
+        if response is not None:
+            _count(PAGE_CACHE_HITS_KEY)
+            response["X-Page-Cache"] = "HIT"
+            # Валидаторы выставляет conditional_page по текущему состоянию.
+            response.headers.pop("ETag", None)
+            response.headers.pop("Last-Modified", None)
+            return response
+
+        _count(PAGE_CACHE_MISSES_KEY)
+        response = view_func(request, *args, **kwargs)
+        if response.status_code != 200 or response.cookies:
+            return response
+        response["X-Page-Cache"] = "MISS"
+
+        def store(response):
+            cache.set(key, response, _get_page_timeout())
+
+        if hasattr(response, "render") and callable(response.render):
+            response.add_post_render_callback(store)
+        else:
+            store(response)
+        return response
+
+    return wrapper
+
+
+def conditional_page(get_posts, *timestamp_fields, etag_extra=None):
+    """Поддержка условных GET-запросов (ETag / Last-Modified) для страницы.
+
+    get_posts(request, *args, **kwargs) возвращает выборку публикаций
+    страницы. Валидаторы считаются по версиям контента и максимальным
+    значениям timestamp_fields в выборке одним агрегирующим запросом, без
+    рендеринга. Last-Modified выдаётся только анонимным посетителям:
+    у авторизованных страница зависит ещё и от пользователя.
+    etag_extra(request, *args, **kwargs) добавляет в ETag то, что меняет
+    страницу помимо публикаций (например, очередь комментариев автора).
+    """
+    timestamp_fields = timestamp_fields or ("pub_date",)
+
+    def get_validators(request, *args, **kwargs):
+        if not hasattr(request, "_content_validators"):
+            scope = _get_page_scope(kwargs)
+            version = (get_content_version(), get_content_version(scope))
+            changed_at = get_content_changed_at(scope)
+            timestamps = list(get_posts(request, *args, **kwargs).aggregate(
+                *(Max(field) for field in timestamp_fields)
+            ).values())
+            extra = (
+                etag_extra(request, *args, **kwargs) if etag_extra else None
+            )
+            etag = md5(":".join(map(str, (
+                version, request.user.pk, request.get_full_path(),
+                *timestamps, extra,
+            ))).encode()).hexdigest()
+            last_modified = None
+            if changed_at is not None and not request.user.is_authenticated:
+                last_modified = max(
+                    [changed_at, *filter(None, timestamps)]
+                )
+            request._content_validators = etag, last_modified
+        return request._content_validators
+
+    def decorator(view_func):
+        view = condition(
+            etag_func=lambda *args, **kwargs: get_validators(
+                *args, **kwargs)[0],
+            last_modified_func=lambda *args, **kwargs: get_validators(
+                *args, **kwargs)[1],
+        )(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            patch_cache_control(
+                response, no_cache=True,
+                private=request.user.is_authenticated,
+            )
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,22 @@
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Кеш страниц и карточек должен быть общим для всех процессов."""
+    if not isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return []
+    return [
+        Warning(
+            "Кеш по умолчанию — LocMemCache, он свой у каждого процесса.",
+            hint=(
+                "При нескольких процессах веб-сервера изменения в одном из "
+                "них не сбросят страницы, закешированные другими. Задайте "
+                "общий кеш (DJANGO_CACHE_BACKEND) или запускайте один "
+                "процесс."
+            ),
+            id="blog.W001",
+        )
+    ]
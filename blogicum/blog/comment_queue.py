@@ -0,0 +1,312 @@
+"""Отложенная пакетная запись комментариев (write-behind).
+
+Комментарий сначала попадает в локальную очередь в отдельном файле SQLite,
+а в основную базу переносится пакетами: один bulk_create и одно обновление
+счётчика на каждый пост пакета в одной транзакции. Доставка «хотя бы
+один раз»: если процесс упадёт между фиксацией пакета и удалением его из
+очереди, пакет будет записан повторно.
+"""
+import logging
+import os
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from time import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from .cache import bump_post_versions
+from .models import Comment, Post, User
+
+# Сколько секунд аренда записи действует без продления
+LEASE_TTL = 60
+# Наибольшая пауза между попытками записи после ошибок, секунды
+MAX_FLUSH_BACKOFF = 60
+
+logger = logging.getLogger(__name__)
+
+_queues = {}
+_queues_lock = threading.Lock()
+_flusher = None
+
+
+class CommentQueue:
+    """Очередь комментариев в файле SQLite, общая для потоков процесса."""
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None
+        )
+        self.db.execute("PRAGMA journal_mode = wal")
+        # Комментарий считается принятым, только когда он на диске.
+        self.db.execute("PRAGMA synchronous = full")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS pending_comment ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "post_id INTEGER NOT NULL, "
+            "author_id INTEGER NOT NULL, "
+            "text TEXT NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS pending_comment_post_author "
+            "ON pending_comment (post_id, author_id)"
+        )
+        # Аренда записи: переносить очередь может только один поток
+        # среди всех процессов, которые делят этот файл.
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS flush_lease ("
+            "id INTEGER PRIMARY KEY CHECK (id = 1), "
+            "owner TEXT NOT NULL, "
+            "expires_at REAL NOT NULL)"
+        )
+        self.db.execute(
+            "INSERT OR IGNORE INTO flush_lease VALUES (1, '', 0)"
+        )
+
+    def acquire_lease(self, owner, ttl=LEASE_TTL):
+        with self.lock:
+            moment = time()
+            return self.db.execute(
+                "UPDATE flush_lease SET owner = ?, expires_at = ? "
+                "WHERE id = 1 AND (owner = ? OR expires_at < ?)",
+                (owner, moment + ttl, owner, moment),
+            ).rowcount == 1
+
+    def release_lease(self, owner):
+        with self.lock:
+            self.db.execute(
+                "UPDATE flush_lease SET expires_at = 0 WHERE owner = ?",
+                (owner,),
+            )
+
+    def put(self, post_id, author_id, text):
+        """Добавляет комментарий и возвращает примерную длину очереди.
+
+        Очередь удаляется только с начала (delete_through), поэтому длину
+        дают id нового комментария и наименьший id по индексу, без COUNT.
+        """
+        with self.lock:
+            last_id = self.db.execute(
+                "INSERT INTO pending_comment "
+                "(post_id, author_id, text, created_at) VALUES (?, ?, ?, ?)",
+                (post_id, author_id, text, time()),
+            ).lastrowid
+            first_id = self.db.execute(
+                "SELECT MIN(id) FROM pending_comment"
+            ).fetchone()[0]
+            return last_id - (first_id or last_id) + 1
+
+    def size(self):
+        return self.db.execute(
+            "SELECT COUNT(*) FROM pending_comment"
+        ).fetchone()[0]
+
+    def count_for(self, post_id, author_id):
+        with self.lock:
+            return self.db.execute(
+                "SELECT COUNT(*) FROM pending_comment "
+                "WHERE post_id = ? AND author_id = ?",
+                (post_id, author_id),
+            ).fetchone()[0]
+
+    def pending_for(self, post_id, author_id):
+        """Ещё не записанные комментарии автора к посту."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT text, created_at FROM pending_comment "
+                "WHERE post_id = ? AND author_id = ? ORDER BY id",
+                (post_id, author_id),
+            ).fetchall()
+        return [
+            {
+                "text": text,
+                "created_at": datetime.fromtimestamp(
+                    created_at, tz=timezone.utc
+                ),
+            }
+            for text, created_at in rows
+        ]
+
+    def take(self, limit):
+        with self.lock:
+            return self.db.execute(
+                "SELECT id, post_id, author_id, text, created_at "
+                "FROM pending_comment ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+    def delete_through(self, last_id):
+        with self.lock:
+            self.db.execute(
+                "DELETE FROM pending_comment WHERE id <= ?", (last_id,)
+            )
+
+    def close(self):
+        self.db.close()
+
+
+def get_comment_queue():
+    path = str(settings.BLOG_COMMENT_QUEUE_PATH)
+    with _queues_lock:
+        if path not in _queues:
+            _queues[path] = CommentQueue(path)
+        return _queues[path]
+
+
+def enqueue_comment(post_id, author, text):
+    """Ставит комментарий в очередь и при необходимости будит запись."""
+    size = get_comment_queue().put(post_id, author.pk, text)
+    flusher = get_flusher()
+    if flusher is not None and size >= settings.BLOG_COMMENT_FLUSH_BATCH:
+        flusher.wake.set()
+
+
+def pending_comments(post, user):
+    """Комментарии пользователя из очереди для показа ему самому."""
+    if not settings.BLOG_COMMENT_WRITE_BEHIND or not user.is_authenticated:
+        return []
+    comments = []
+    for row in get_comment_queue().pending_for(post.pk, user.pk):
+        comment = Comment(post=post, author=user, **row)
+        comment.pending = True
+        comments.append(comment)
+    return comments
+
+
+def pending_marker(request, post_id, **kwargs):
+    """Часть ETag страницы поста, меняющаяся с очередью пользователя."""
+    if not settings.BLOG_COMMENT_WRITE_BEHIND:
+        return None
+    if not request.user.is_authenticated:
+        return None
+    return get_comment_queue().count_for(post_id, request.user.pk)
+
+
+def flush_comment_queue(batch_size=None):
+    """Переносит один пакет из очереди в базу и возвращает его размер.
+
+    Возвращает 0, если очередь пуста или её сейчас переносит другой поток.
+    """
+    queue = get_comment_queue()
+    owner = f"{os.getpid()}:{threading.get_ident()}"
+    if not queue.acquire_lease(owner):
+        return 0
+    try:
+        rows = queue.take(batch_size or settings.BLOG_COMMENT_FLUSH_BATCH)
+        if rows:
+            write_batch(rows)
+            queue.delete_through(rows[-1][0])
+        return len(rows)
+    finally:
+        queue.release_lease(owner)
+
+
+def write_batch(rows):
+    post_ids = {row[1] for row in rows}
+    author_ids = {row[2] for row in rows}
+    # Пост или автор могли быть удалены, пока комментарий ждал в очереди.
+    existing_posts = set(
+        Post.objects.filter(pk__in=post_ids).values_list("pk", flat=True)
+    )
+    existing_authors = set(
+        User.objects.filter(pk__in=author_ids).values_list("pk", flat=True)
+    )
+    comments = [
+        Comment(post_id=post_id, author_id=author_id, text=text)
+        for _, post_id, author_id, text, _ in rows
+        if post_id in existing_posts and author_id in existing_authors
+    ]
+    # Время комментария — момент отправки, сохранённый в очереди: его
+    # автор уже видел, и по нему комментарии упорядочены в ленте.
+    created_at = [
+        datetime.fromtimestamp(row[4], tz=timezone.utc) for row in rows
+        if row[1] in existing_posts and row[2] in existing_authors
+    ]
+    for comment in comments:
+        comment.update_rendered()
+    counts = Counter(comment.post_id for comment in comments)
+    with transaction.atomic():
+        # auto_now_add подставит текущее время, поэтому время из очереди
+        # записывается вторым запросом, не трогая общие для потоков поля.
+        Comment.objects.bulk_create(comments)
+        if comments and comments[0].pk is None:
+            _fetch_created_pks(comments)
+        for comment, moment in zip(comments, created_at):
+            comment.created_at = moment
+        Comment.objects.bulk_update(comments, ["created_at"])
+        for post_id, count in counts.items():
+            Post.objects.filter(pk=post_id).update(
+                comment_count=F("comment_count") + count,
+                updated_at=now(),
+            )
+    if counts:
+        bump_post_versions(counts)
+
+
+def _fetch_created_pks(comments):
+    """Проставляет id комментариям, если bulk_create их не вернул.
+
+    Так бывает на SQLite: там до конца транзакции в базу пишет только
+    она, поэтому последние len(comments) id принадлежат этому пакету.
+    """
+    pks = list(Comment.objects.order_by("-pk").values_list(
+        "pk", flat=True
+    )[:len(comments)])
+    for comment, pk in zip(comments, reversed(pks)):
+        comment.pk = pk
+
+
+class CommentFlusher(threading.Thread):
+    """Фоновый поток, переносящий очередь в базу раз в интервал."""
+
+    def __init__(self, interval):
+        super().__init__(name="blog-comment-flusher", daemon=True)
+        self.interval = interval
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+
+    def stop(self):
+        self.stopped.set()
+        self.wake.set()
+
+    def run(self):
+        delay = self.interval
+        while True:
+            self.wake.wait(delay)
+            self.wake.clear()
+            if self.stopped.is_set():
+                return
+            try:
+                while flush_comment_queue():
+                    pass
+            except Exception:
+                # Очередь на диске сохранится: пробуем снова, увеличивая
+                # паузу, чтобы не нагружать базу, которая сейчас отказывает.
+                delay = min(delay * 2, MAX_FLUSH_BACKOFF)
+                logger.exception(
+                    "Не удалось записать очередь комментариев; "
+                    "повтор через %s с", delay,
+                )
+            else:
+                delay = self.interval
+            finally:
+                connection.close()
+
+
+def get_flusher():
+    """Запускает фоновую запись при первом обращении, если она включена."""
+    global _flusher
+    interval = settings.BLOG_COMMENT_FLUSH_INTERVAL
+    if not interval:
+        return None
+    with _queues_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = CommentFlusher(interval)
+            _flusher.start()
+    return _flusher
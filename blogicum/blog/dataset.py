@@ -0,0 +1,217 @@
+"""Генерация синтетических данных блога для нагрузочных замеров."""
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+from django.utils.timezone import now
+
+from .cache import bump_content_version, clear_category_cache
+from .models import (
+    Category, Comment, Location, Post, RenderedTextModel, User
+)
+from .search import get_search_backend
+
+DATASET_PREFIX = "bench"
+DATASET_PASSWORD = "bench-password"
+
+WORDS = (
+    "город море горы лес река утро вечер дорога поезд самолёт музей парк "
+    "кофе книга фотография прогулка друзья погода осень зима весна лето "
+    "история путешествие заметка выставка концерт мост площадь набережная"
+).split()
+
+
+@contextmanager
+def auto_now_disabled(models):
+    """Сохраняет заданные даты вместо подстановки текущего времени."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False)
+        or getattr(field, "auto_now_add", False)
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class DatasetGenerator:
+    """Создаёт пользователей, категории, места, публикации и комментарии.
+
+    Данные воспроизводимы при одинаковом seed. Около 10% публикаций
+    сняты с публикации, около 5% запланированы на будущее, одна категория
+    из десяти скрыта. Комментарии распределены неравномерно: у немногих
+    публикаций их много, у большинства — единицы.
+    """
+
+    def __init__(self, users=50, categories=10, locations=20, posts=1000,
+                 comments=5000, seed=0, batch_size=1000):
+        self.sizes = {
+            "users": users,
+            "categories": categories,
+            "locations": locations,
+            "posts": posts,
+            "comments": comments,
+        }
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.started = now()
+
+    def words(self, low, high):
+        return " ".join(
+            self.random.choices(WORDS, k=self.random.randint(low, high))
+        )
+
+    def past(self, days=365):
+        return self.started - timedelta(
+            seconds=self.random.randint(60, days * 24 * 60 * 60)
+        )
+
+    def generate(self):
+        """Записывает данные в базу и возвращает число созданных объектов."""
+        with transaction.atomic(), auto_now_disabled((Post, Comment)):
+            users = self.create_users()
+            categories = self.create_categories()
+            locations = self.create_locations()
+            posts = self.create_posts(users, categories, locations)
+            self.create_comments(users, posts)
+        get_search_backend().rebuild()
+        clear_category_cache()
+        bump_content_version()
+        return dict(self.sizes)
+
+    def bulk_create(self, model, objects):
+        """Создаёт объекты и возвращает их уже с первичными ключами.
+
+        SQLite не возвращает ключи из bulk_create, поэтому новые строки
+        перечитываются по диапазону ключей.
+        """
+        last_pk = model.objects.aggregate(last_pk=Max("pk"))["last_pk"]
+        objects = list(objects)
+        if issubclass(model, RenderedTextModel):
+            # bulk_create обходит save(), где считаются анонс и HTML.
+            for obj in objects:
+                obj.update_rendered()
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+        return list(
+            model.objects.filter(pk__gt=last_pk or 0).order_by("pk")
+        )
+
+    def create_users(self):
+        # Хеширование пароля медленное, поэтому он общий для всех.
+        password = make_password(DATASET_PASSWORD)
+        offset = User.objects.count()
+        return self.bulk_create(User, (
+            User(
+                username=f"{DATASET_PREFIX}_user_{number}",
+                first_name=self.words(1, 1).title(),
+                email=f"{DATASET_PREFIX}_user_{number}@example.com",
+                password=password,
+            )
+            for number in range(offset, offset + self.sizes["users"])
+        ))
+
+    def create_categories(self):
+        offset = Category.objects.count()
+        return self.bulk_create(Category, (
+            Category(
+                title=self.words(1, 3).capitalize(),
+                description=self.words(5, 20),
+                slug=f"{DATASET_PREFIX}-category-{number}",
+                is_published=number % 10 != 9,
+            )
+            for number in range(offset, offset + self.sizes["categories"])
+        ))
+
+    def create_locations(self):
+        return self.bulk_create(Location, (
+            Location(name=self.words(1, 2).capitalize())
+            for _ in range(self.sizes["locations"])
+        ))
+
+    def create_posts(self, users, categories, locations):
+        posts = []
+        for number in range(self.sizes["posts"]):
+            pub_date = self.past()
+            if self.random.random() < 0.05:
+                pub_date = self.started + timedelta(
+                    days=self.random.randint(1, 30)
+                )
+            posts.append(Post(
+                title=self.words(2, 8).capitalize(),
+                text=self.words(30, 300),
+                pub_date=pub_date,
+                created_at=min(pub_date, self.started),
+                author=self.random.choice(users),
+                category=(
+                    self.random.choice(categories) if categories else None
+                ),
+                location=(
+                    self.random.choice(locations)
+                    if locations and self.random.random() < 0.7 else None
+                ),
+                is_published=self.random.random() >= 0.1,
+            ))
+        return self.bulk_create(Post, posts)
+
+    def create_comments(self, users, posts):
+        if not posts:
+            return []
+        weights = [1 / (rank + 1) for rank in range(len(posts))]
+        targets = self.random.choices(
+            posts, weights=weights, k=self.sizes["comments"]
+        )
+        comments = []
+        for post in targets:
+            post.comment_count += 1
+            comments.append(Comment(
+                post=post,
+                author=self.random.choice(users),
+                text=self.words(3, 40),
+                created_at=post.created_at + self.random.random() * (
+                    self.started - post.created_at
+                ),
+            ))
+        self.bulk_create(Comment, comments)
+        Post.objects.bulk_update(
+            posts, ["comment_count"], batch_size=self.batch_size
+        )
+        return comments
+
+
+def generate_dataset(**sizes):
+    return DatasetGenerator(**sizes).generate()
+
+
+def add_dataset_arguments(parser):
+    """Добавляет команде управления аргументы размеров набора данных."""
+    for name, default, help_text in (
+        ("users", 50, "Число пользователей."),
+        ("categories", 10, "Число категорий."),
+        ("locations", 20, "Число местоположений."),
+        ("posts", 1000, "Число публикаций."),
+        ("comments", 5000, "Число комментариев."),
+        ("seed", 0, "Начальное значение генератора случайных чисел."),
+        ("batch-size", 1000, "Размер пакета bulk_create."),
+    ):
+        parser.add_argument(
+            f"--{name}", type=int, default=default, help=help_text
+        )
+
+
+def dataset_options(options):
+    """Выбирает из опций команды аргументы DatasetGenerator."""
+    return {
+        name: options[name]
+        for name in (
+            "users", "categories", "locations", "posts", "comments",
+            "seed", "batch_size",
+        )
+    }
@@ -14,10 +14,20 @@ class UserUpdateForm(forms.ModelForm):
 class PostUpdateForm(forms.ModelForm):
     """Форма создания и обновления поста"""
 
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_errors = upload_errors or {}
+
     class Meta:
         model = Post
         exclude = ('author',)
 
+    def clean(self):
+        for field, error in self.upload_errors.items():
+            self.errors.pop(field, None)
+            self.add_error(field, error)
+        return super().clean()
+
 
 class CommentUpdateForm(forms.ModelForm):
     """Форма для создания комментария"""
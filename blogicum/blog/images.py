@@ -0,0 +1,127 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.utils.timezone import now
+from PIL import Image
+
+from .cache import bump_post_versions
+from .models import Post
+
+# Имя варианта -> максимальная ширина и высота в пикселях
+RENDITIONS = {
+    "card": 640,
+    "detail": 1280,
+}
+RENDITIONS_DIR = "renditions"
+WEBP = "webp"
+
+_executor = None
+
+logger = logging.getLogger(__name__)
+
+
+def rendition_name(name, rendition, extension=None):
+    """Имя файла варианта изображения рядом с оригиналом."""
+    path = PurePosixPath(name)
+    extension = extension or path.suffix.lstrip(".")
+    return str(
+        path.parent / RENDITIONS_DIR / f"{path.stem}_{rendition}.{extension}"
+    )
+
+
+def get_rendition_urls(name):
+    """URL вариантов изображения: {вариант: {формат: url}}.
+
+    Хранилище не опрашивается: вызывающий код проверяет по
+    Post.renditions_image, что варианты уже созданы.
+    """
+    return {
+        rendition: {
+            extension or "original": default_storage.url(
+                rendition_name(name, rendition, extension)
+            )
+            for extension in (None, WEBP)
+        }
+        for rendition in RENDITIONS
+    }
+
+
+def generate_renditions(name):
+    """Создаёт уменьшенные копии изображения в исходном формате и в WebP."""
+    with default_storage.open(name) as file:
+        image = Image.open(file)
+        image.load()
+    image_format = image.format or "JPEG"
+    for rendition, size in RENDITIONS.items():
+        resized = image.copy()
+        resized.thumbnail((size, size))
+        if image_format == "JPEG" and resized.mode not in ("RGB", "L"):
+            resized = resized.convert("RGB")
+        for extension, save_format in ((None, image_format), (WEBP, "WEBP")):
+            buffer = BytesIO()
+            resized.save(buffer, format=save_format, quality=85)
+            variant = rendition_name(name, rendition, extension)
+            if default_storage.exists(variant):
+                default_storage.delete(variant)
+            default_storage.save(variant, ContentFile(buffer.getvalue()))
+
+
+def mark_renditions_ready(post_id, name):
+    """Запоминает, что копии созданы, и сбрасывает страницы с постом.
+
+    Если изображение успели заменить, пост остаётся с оригиналом до
+    обработки нового файла.
+    """
+    if Post.objects.filter(pk=post_id, image=name).update(
+        renditions_image=name, updated_at=now()
+    ):
+        bump_post_versions([post_id])
+
+
+def _process(name, post_id):
+    generate_renditions(name)
+    mark_renditions_ready(post_id, name)
+
+
+def _process_in_worker(name, post_id):
+    try:
+        _process(name, post_id)
+    finally:
+        connection.close()
+
+
+def _log_failure(future, name):
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        logger.error(
+            "Не удалось создать уменьшенные копии %s", name,
+            exc_info=(type(error), error, error.__traceback__),
+        )
+
+
+def schedule_renditions(name, post_id):
+    """Ставит обработку изображения в фоновый пул потоков.
+
+    При BLOG_IMAGE_WORKERS = 0 варианты создаются сразу в текущем потоке.
+    """
+    global _executor
+    if not settings.BLOG_IMAGE_WORKERS:
+        return _process(name, post_id)
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BLOG_IMAGE_WORKERS,
+            thread_name_prefix="blog-images",
+        )
+    future = _executor.submit(_process_in_worker, name, post_id)
+    # Иначе ошибка Pillow или хранилища в потоке пула пропадёт бесследно,
+    # а пост так и будет показывать оригинал.
+    future.add_done_callback(lambda future: _log_failure(future, name))
+    return future
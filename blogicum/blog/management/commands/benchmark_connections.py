@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает накладные расходы на подключение к базе при "
+        "CONN_MAX_AGE = 0 и постоянных соединениях под параллельной "
+        "нагрузкой."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument(
+            "--requests", type=int, default=200,
+            help="Сколько запросов выполняет каждый поток.",
+        )
+        parser.add_argument(
+            "--max-age", type=int, default=60,
+            help="CONN_MAX_AGE для режима постоянных соединений.",
+        )
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, threads, requests, max_age, database, **options):
+        settings_dict = connections[database].settings_dict
+        saved_max_age = settings_dict["CONN_MAX_AGE"]
+        try:
+            for title, conn_max_age in (
+                ("Новое соединение на запрос", 0),
+                (f"Постоянные соединения ({max_age} с)", max_age),
+            ):
+                # Словарь настроек общий для соединений всех потоков.
+                settings_dict["CONN_MAX_AGE"] = conn_max_age
+                connections.close_all()
+                self.report(title, *self.run(database, threads, requests))
+        finally:
+            settings_dict["CONN_MAX_AGE"] = saved_max_age
+
+    def run(self, database, threads, requests):
+        opened = []
+        lock = Lock()
+
+        def count_connection(sender, connection, **kwargs):
+            if connection.alias == database:
+                with lock:
+                    opened.append(connection)
+
+        def worker():
+            timings = []
+            try:
+                for _ in range(requests):
+                    started = perf_counter()
+                    # Те же шаги, что делает обработчик запросов Django.
+                    close_old_connections()
+                    list(
+                        Post.published.using(database)
+                        .select_related("author", "category", "location")
+                        .order_by("-pub_date", "-id")[:10]
+                    )
+                    close_old_connections()
+                    timings.append(perf_counter() - started)
+            finally:
+                connections.close_all()
+            return timings
+
+        connection_created.connect(count_connection)
+        try:
+            started = perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                futures = [executor.submit(worker) for _ in range(threads)]
+                timings = sorted(
+                    timing for future in futures for timing in future.result()
+                )
+            elapsed = perf_counter() - started
+        finally:
+            connection_created.disconnect(count_connection)
+        return timings, elapsed, len(opened)
+
+    def report(self, title, timings, elapsed, opened):
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        self.stdout.write(
+            f"  запросов: {len(timings)}, соединений открыто: {opened}, "
+            f"всего {elapsed:.2f} с, {len(timings) / elapsed:.0f} запросов/с"
+        )
+        self.stdout.write(
+            f"  среднее {sum(timings) / len(timings) * 1000:.2f} мс, "
+            f"p95 {p95 * 1000:.2f} мс"
+        )
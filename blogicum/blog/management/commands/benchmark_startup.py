@@ -0,0 +1,98 @@
+import json
+import subprocess
+import sys
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+DEFAULT_SETTINGS = ("blogicum.settings", "blogicum.settings_production")
+DEFAULT_PATHS = ("/", "/pages/about/", "/pages/rules/")
+
+
+class Command(BaseCommand):
+    help = (
+        "Запускает проект в отдельных процессах с разными модулями настроек "
+        "и сравнивает время запуска, первого и повторного запросов."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--settings-modules", nargs="+", default=DEFAULT_SETTINGS,
+            help="Модули настроек для сравнения.",
+        )
+        parser.add_argument(
+            "--paths", nargs="+", default=DEFAULT_PATHS,
+            help="Адреса, которые запрашиваются после запуска.",
+        )
+        parser.add_argument(
+            "--child", action="store_true",
+            help="Служебный режим: замер внутри уже запущенного процесса.",
+        )
+
+    def handle(self, *args, settings_modules, paths, child, **options):
+        if child:
+            self.stdout.write(json.dumps(self.measure(paths)))
+            return
+
+        for module in settings_modules:
+            self.prepare(module)
+            started = perf_counter()
+            process = subprocess.run(
+                [
+                    sys.executable, sys.argv[0], "benchmark_startup",
+                    "--child", "--settings", module, "--paths", *paths,
+                ],
+                capture_output=True, text=True,
+            )
+            process_ms = (perf_counter() - started) * 1000
+            if process.returncode:
+                raise CommandError(
+                    f"Не удалось запустить {module}:\n{process.stderr}"
+                )
+            result = json.loads(process.stdout)
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{module}: процесс {process_ms:.0f} мс"
+            ))
+            for path, first_ms, second_ms in result:
+                self.stdout.write(
+                    f"  {path}: первый запрос {first_ms:.1f} мс, "
+                    f"повторный {second_ms:.1f} мс"
+                )
+
+    def prepare(self, module):
+        """Создаёт таблицу кеша, если модуль настроек использует DatabaseCache.
+
+        Отдельным процессом, чтобы это не вошло во время запуска;
+        для других кешей и уже созданной таблицы команда ничего не делает.
+        """
+        process = subprocess.run(
+            [
+                sys.executable, sys.argv[0], "createcachetable",
+                "--settings", module,
+            ],
+            capture_output=True, text=True,
+        )
+        if process.returncode:
+            raise CommandError(
+                f"Не удалось создать таблицу кеша для {module}:\n"
+                f"{process.stderr}"
+            )
+
+    def measure(self, paths):
+        client = Client()
+        results = []
+        # Кеш страниц скрыл бы время рендеринга повторных запросов.
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            BLOG_PAGE_CACHE_TIMEOUT=0,
+        ):
+            for path in paths:
+                timings = []
+                for _ in range(2):
+                    started = perf_counter()
+                    client.get(path)
+                    timings.append((perf_counter() - started) * 1000)
+                results.append((path, *timings))
+        return results
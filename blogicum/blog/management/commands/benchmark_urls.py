@@ -0,0 +1,234 @@
+import json
+import platform
+import statistics
+import tracemalloc
+from time import perf_counter
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+
+from blog import urls as blog_urls
+from blog.cache import clear_category_cache
+from blog.dataset import (
+    DatasetGenerator, add_dataset_arguments, dataset_options,
+)
+from blog.models import Category, Comment, Location, Post, User
+from pages import urls as pages_urls
+
+URL_MODULES = (blog_urls, pages_urls)
+ANONYMOUS = "anonymous"
+AUTHENTICATED = "authenticated"
+# Замер очищает кеш перед каждым адресом, поэтому работает со своим
+# кешем в памяти, а не с общим кешем сервера из CACHES.
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "benchmark_urls",
+    }
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет время ответа, число SQL-запросов и пик памяти для всех "
+        "адресов blog/urls.py и pages/urls.py и сохраняет отчёт в JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat", type=int, default=10,
+            help="Сколько раз повторять запрос после первого.",
+        )
+        parser.add_argument(
+            "--output", help="Файл отчёта; по умолчанию отчёт выводится.",
+        )
+        parser.add_argument(
+            "--baseline",
+            help="Отчёт предыдущего замера для сравнения с текущим.",
+        )
+        parser.add_argument(
+            "--generate", action="store_true",
+            help=(
+                "Создать набор данных перед замером и откатить его после; "
+                "иначе замеряется текущее содержимое базы."
+            ),
+        )
+        add_dataset_arguments(parser)
+
+    def handle(self, *args, repeat, output, baseline, generate, **options):
+        with override_settings(CACHES=BENCHMARK_CACHES):
+            if generate:
+                try:
+                    with transaction.atomic():
+                        DatasetGenerator(
+                            **dataset_options(options)
+                        ).generate()
+                        report = self.run(repeat)
+                        raise Rollback
+                except Rollback:
+                    pass
+                # В кеше процесса остались категории откаченных данных.
+                clear_category_cache()
+            else:
+                report = self.run(repeat)
+            cache.clear()
+
+        content = json.dumps(report, ensure_ascii=False, indent=2)
+        if output:
+            with open(output, "w", encoding="utf-8") as file:
+                file.write(content + "\n")
+        else:
+            self.stdout.write(content)
+        if baseline:
+            self.compare(report, baseline)
+
+    def get_samples(self):
+        """Аргументы адресов и владельцы объектов для их замера."""
+        post = (
+            Post.published.select_related("author", "category")
+            .order_by("-comment_count", "-pub_date").first()
+        )
+        if post is None:
+            raise CommandError(
+                "Нет опубликованных постов: заполните базу командой "
+                "seed_blog или запустите замер с --generate."
+            )
+        comment = post.comments.select_related("author").first()
+        return {
+            "post_id": post.id,
+            "category_slug": post.category.slug,
+            "username": post.author.username,
+            "comment_id": comment.id if comment else 0,
+        }, {
+            "post": post.author,
+            "comment": comment.author if comment else post.author,
+        }
+
+    def get_urls(self, kwargs):
+        for module in URL_MODULES:
+            for pattern in module.urlpatterns:
+                name = f"{module.app_name}:{pattern.name}"
+                params = pattern.pattern.converters
+                yield name, params, reverse(
+                    name, kwargs={param: kwargs[param] for param in params}
+                )
+
+    def run(self, repeat):
+        kwargs, owners = self.get_samples()
+        clients = {ANONYMOUS: Client()}
+        results = []
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+        ):
+            for name, params, path in self.get_urls(kwargs):
+                # Страницы редактирования доступны только автору объекта.
+                clients[AUTHENTICATED] = Client()
+                clients[AUTHENTICATED].force_login(
+                    owners["comment" if "comment_id" in params else "post"]
+                )
+                for user, client in clients.items():
+                    results.append(
+                        self.measure(client, name, path, user, repeat)
+                    )
+        return {
+            "created_at": now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "repeat": repeat,
+            "dataset": {
+                model._meta.label: model.objects.count()
+                for model in (User, Category, Location, Post, Comment)
+            },
+            "results": results,
+        }
+
+    def measure(self, client, name, path, user, repeat):
+        """Первый запрос на пустом кеше, затем repeat повторных."""
+        cache.clear()
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        # CaptureQueriesContext не подходит: сигнал request_started
+        # очищает журнал запросов соединения в начале каждого запроса.
+        with connection.execute_wrapper(count_query):
+            started = perf_counter()
+            response = client.get(path)
+            cold = perf_counter() - started
+
+        timings = []
+        for _ in range(repeat):
+            started = perf_counter()
+            client.get(path)
+            timings.append(perf_counter() - started)
+
+        cache.clear()
+        tracemalloc.start()
+        try:
+            client.get(path)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        result = {
+            "name": name,
+            "path": path,
+            "user": user,
+            "status": response.status_code,
+            "bytes": len(response.content),
+            "queries": len(queries),
+            "cold_ms": round(cold * 1000, 3),
+            "memory_peak_kib": round(peak / 1024, 1),
+        }
+        if timings:
+            result |= {
+                "mean_ms": round(statistics.mean(timings) * 1000, 3),
+                "p50_ms": round(percentile(timings, 0.5) * 1000, 3),
+                "p95_ms": round(percentile(timings, 0.95) * 1000, 3),
+            }
+        return result
+
+    def compare(self, report, baseline):
+        try:
+            with open(baseline, encoding="utf-8") as file:
+                previous = {
+                    (result["name"], result["user"]): result
+                    for result in json.load(file)["results"]
+                }
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f"Не удалось прочитать {baseline}: {error}")
+        self.stderr.write("Сравнение с базовым отчётом:")
+        for result in report["results"]:
+            old = previous.get((result["name"], result["user"]))
+            if old is None:
+                continue
+            line = (
+                f"{result['name']} ({result['user']}): "
+                f"запросов {old['queries']} → {result['queries']}, "
+                f"первый {old['cold_ms']} → {result['cold_ms']} мс"
+            )
+            if "p50_ms" in old and "p50_ms" in result:
+                line += f", p50 {old['p50_ms']} → {result['p50_ms']} мс"
+            style = (
+                self.style.WARNING if result["queries"] > old["queries"]
+                else self.style.SUCCESS
+            )
+            self.stderr.write(style(line))
@@ -0,0 +1,77 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from blog.dataset import DatasetGenerator
+from blog.models import Comment, Post
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Показывает планы и время горячих запросов лент публикаций "
+        "с индексами и без них."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Сначала добавить столько тестовых публикаций.",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, seed, batch_size, **options):
+        if seed:
+            self.seed(seed, batch_size)
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Без индексов"))
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for model in (Post, Comment):
+                        for index in model._meta.indexes:
+                            cursor.execute("DROP INDEX {}".format(
+                                connection.ops.quote_name(index.name)
+                            ))
+                self.explain_all()
+                raise Rollback
+        except Rollback:
+            pass
+        # Сбрасывает кеш подготовленных запросов, иначе SQLite вернёт
+        # планы EXPLAIN, построенные без индексов.
+        connection.close()
+
+        self.stdout.write(self.style.MIGRATE_HEADING("С индексами"))
+        self.explain_all()
+
+    def get_queries(self):
+        feed = Post.published.select_related(
+            "author", "category", "location"
+        ).order_by("-pub_date", "-id")
+        queries = {"Лента": feed[:10]}
+        post = Post.objects.order_by("-pub_date").first()
+        if post is not None:
+            queries |= {
+                "Категория": feed.filter(category_id=post.category_id)[:10],
+                "Профиль": feed.filter(author_id=post.author_id)[:10],
+                "Комментарии": Comment.objects.filter(post_id=post.id)[:10],
+            }
+        return queries
+
+    def explain_all(self):
+        for title, queryset in self.get_queries().items():
+            started = perf_counter()
+            list(queryset)
+            elapsed = (perf_counter() - started) * 1000
+            self.stdout.write(f"{title}: {elapsed:.2f} мс")
+            self.stdout.write(queryset.explain())
+
+    def seed(self, count, batch_size):
+        DatasetGenerator(
+            posts=count, comments=count, batch_size=batch_size
+        ).generate()
+        self.stdout.write(f"Добавлено публикаций: {count}")
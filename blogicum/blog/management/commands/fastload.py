@@ -0,0 +1,267 @@
+import json
+from collections import defaultdict
+
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
+
+from blog.cache import bump_content_version, clear_category_cache
+from blog.dataset import auto_now_disabled
+from blog.models import Category, Comment, Post, RenderedTextModel, User
+from blog.search import get_search_backend
+
+READ_SIZE = 64 * 1024
+WHITESPACE = " \t\r\n"
+# Сколько id передавать в один IN: SQLite допускает не больше 999
+# параметров в запросе, а --batch-size может быть больше.
+LOOKUP_CHUNK_SIZE = 500
+
+
+def chunked(items, size=LOOKUP_CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class JSONArrayReader:
+    """Поочерёдно разбирает элементы JSON-массива, не читая файл целиком."""
+
+    decoder = json.JSONDecoder()
+
+    def __init__(self, stream, read_size=READ_SIZE):
+        self.stream = stream
+        self.read_size = read_size
+        self.buffer = ""
+        self.position = 0
+
+    def read_more(self):
+        chunk = self.stream.read(self.read_size)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return bool(chunk)
+
+    def next_char(self, skip):
+        """Первый символ после пропущенных skip или "" в конце файла."""
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in skip
+            ):
+                self.position += 1
+            if self.position < len(self.buffer) or not self.read_more():
+                return self.buffer[self.position:self.position + 1]
+
+    def decode(self):
+        while True:
+            try:
+                item, self.position = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+                return item
+            except json.JSONDecodeError as error:
+                if not self.read_more():
+                    raise DeserializationError(error)
+
+    def __iter__(self):
+        if self.next_char(WHITESPACE) != "[":
+            raise DeserializationError("Ожидается JSON-массив.")
+        self.position += 1
+        while True:
+            char = self.next_char(WHITESPACE + ",")
+            if not char:
+                raise DeserializationError("Незакрытый JSON-массив.")
+            if char == "]":
+                return
+            yield self.decode()
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает JSON-фикстуру потоково, пакетами bulk_create в одной "
+        "транзакции с отложенной проверкой внешних ключей."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("fixtures", nargs="+", help="Пути к JSON-файлам.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--database", default=DEFAULT_DB_ALIAS,
+            help="Псевдоним базы данных для загрузки.",
+        )
+        parser.add_argument(
+            "--full-refresh", action="store_true",
+            help=(
+                "Пересчитать счётчики и перестроить поисковый индекс для "
+                "всех публикаций, а не только затронутых фикстурой."
+            ),
+        )
+
+    def handle(self, *args, fixtures, batch_size, database, full_refresh,
+               **options):
+        self.using = database
+        self.batch_size = batch_size
+        self.full_refresh = full_refresh
+        # id публикаций, чьи счётчики и строки индекса нужно обновить,
+        # и id объектов, попадающих в индекс через публикации.
+        self.post_ids = set()
+        self.indexed_ids = defaultdict(set)
+        self.pending = defaultdict(list)
+        self.pending_m2m = defaultdict(list)
+        self.counts = defaultdict(int)
+        connection = connections[database]
+
+        with transaction.atomic(using=database):
+            with connection.constraint_checks_disabled():
+                with auto_now_disabled(apps.get_models()):
+                    for path in fixtures:
+                        self.load(path)
+                    for model in list(self.pending):
+                        self.flush(model)
+                    for through in list(self.pending_m2m):
+                        self.flush_m2m(through)
+            models = list(self.counts)
+            connection.check_constraints(
+                table_names=[model._meta.db_table for model in models]
+            )
+            sequence_sql = connection.ops.sequence_reset_sql(
+                no_style(), models
+            )
+            if sequence_sql:
+                with connection.cursor() as cursor:
+                    for sql in sequence_sql:
+                        cursor.execute(sql)
+
+        self.refresh_derived_data()
+        for model, count in self.counts.items():
+            self.stdout.write(f"{model._meta.label}: {count}")
+
+    def load(self, path):
+        try:
+            stream = open(path, encoding="utf-8")
+        except OSError as error:
+            raise CommandError(f"Не удалось открыть {path}: {error}")
+        with stream:
+            for item in JSONArrayReader(stream):
+                for deserialized in Deserializer([item], using=self.using):
+                    self.add(deserialized)
+
+    def add(self, deserialized):
+        obj = deserialized.object
+        model = type(obj)
+        self.pending[model].append(obj)
+        for name, values in (deserialized.m2m_data or {}).items():
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            self.pending_m2m[through].extend(
+                through(**{
+                    f"{field.m2m_field_name()}_id": obj.pk,
+                    f"{field.m2m_reverse_field_name()}_id": value,
+                })
+                for value in values
+            )
+        if len(self.pending[model]) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model):
+        """Записывает накопленные объекты модели.
+
+        Как и loaddata, объекты с уже существующим первичным ключом
+        обновляются, остальные создаются.
+        """
+        objects = self.pending.pop(model, [])
+        if issubclass(model, RenderedTextModel):
+            for obj in objects:
+                obj.update_rendered()
+        manager = model._base_manager.using(self.using)
+        existing = set()
+        for pks in chunked(obj.pk for obj in objects if obj.pk is not None):
+            existing.update(
+                manager.filter(pk__in=pks).values_list("pk", flat=True)
+            )
+        to_update = [obj for obj in objects if obj.pk in existing]
+        to_create = [obj for obj in objects if obj.pk not in existing]
+        if to_update:
+            manager.bulk_update(
+                to_update,
+                [
+                    field.name for field in model._meta.concrete_fields
+                    if not field.primary_key
+                ],
+                batch_size=self.batch_size,
+            )
+        manager.bulk_create(to_create, batch_size=self.batch_size)
+        self.counts[model] += len(objects)
+        self.track_changes(model, objects)
+
+    def track_changes(self, model, objects):
+        """Запоминает, каким публикациям нужны счётчик и строка индекса."""
+        if model is Post:
+            if any(obj.pk is None for obj in objects):
+                # bulk_create на SQLite не возвращает id новых строк.
+                self.full_refresh = True
+            self.post_ids.update(obj.pk for obj in objects)
+        elif model is Comment:
+            self.post_ids.update(obj.post_id for obj in objects)
+        elif model in (Category, User):
+            # Название категории и имя автора хранятся в индексе.
+            self.indexed_ids[model].update(obj.pk for obj in objects)
+
+    def flush_m2m(self, through):
+        through._base_manager.using(self.using).bulk_create(
+            self.pending_m2m.pop(through), batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+
+    def refresh_derived_data(self):
+        """Обновляет то, что при обычном сохранении делают сигналы.
+
+        Счётчики пересчитываются у публикаций из фикстуры и публикаций её
+        комментариев, индекс обновляется у них же и у публикаций её
+        категорий и авторов; --full-refresh пересчитывает всё.
+        """
+        if self.full_refresh:
+            call_command("recount_comments", stdout=self.stdout)
+            get_search_backend().rebuild()
+        else:
+            self.recount_comments(self.post_ids)
+            self.reindex(self.post_ids | self.get_related_post_ids())
+        clear_category_cache()
+        bump_content_version()
+
+    def get_related_post_ids(self):
+        posts = Post.objects.using(self.using)
+        post_ids = set()
+        for model, field in ((Category, "category"), (User, "author")):
+            for pks in chunked(self.indexed_ids[model]):
+                post_ids.update(posts.filter(
+                    **{f"{field}__in": pks}
+                ).values_list("pk", flat=True))
+        return post_ids
+
+    def recount_comments(self, post_ids):
+        posts = Post.objects.using(self.using)
+        counts = Comment.objects.using(self.using).filter(
+            post=OuterRef("pk")
+        ).order_by().values("post").annotate(
+            total=Count("pk")
+        ).values("total")
+        for pks in chunked(post_ids):
+            posts.filter(pk__in=pks).update(
+                comment_count=Coalesce(Subquery(counts), 0),
+                updated_at=now(),
+            )
+
+    def reindex(self, post_ids):
+        posts = Post.objects.using(self.using).select_related(
+            "author", "category"
+        )
+        backend = get_search_backend()
+        for pks in chunked(post_ids):
+            backend.index(posts.filter(pk__in=pks))
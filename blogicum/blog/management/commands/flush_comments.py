@@ -0,0 +1,38 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand
+
+from blog.comment_queue import flush_comment_queue, get_comment_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит комментарии из очереди отложенной записи в базу "
+        "пакетами. С --loop работает постоянно, как отдельный процесс "
+        "вместо фоновых потоков веб-сервера."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--loop", action="store_true")
+        parser.add_argument(
+            "--interval", type=float, default=1,
+            help="Пауза между проверками очереди в режиме --loop, секунды.",
+        )
+
+    def handle(self, *args, batch_size, loop, interval, **options):
+        while True:
+            written = 0
+            while True:
+                batch = flush_comment_queue(batch_size)
+                if not batch:
+                    break
+                written += batch
+            if written or not loop:
+                self.stdout.write(
+                    f"Записано комментариев: {written}, "
+                    f"в очереди: {get_comment_queue().size()}"
+                )
+            if not loop:
+                return
+            sleep(interval)
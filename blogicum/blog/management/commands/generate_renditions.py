@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import generate_renditions, mark_renditions_ready
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Создаёт уменьшенные копии изображений всех публикаций."
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image="").values_list("id", "image")
+        for post_id, name in posts.iterator():
+            try:
+                generate_renditions(name)
+            except (OSError, ValueError) as error:
+                self.stderr.write(f"{name}: {error}")
+                continue
+            mark_renditions_ready(post_id, name)
+        self.stdout.write("Готово.")
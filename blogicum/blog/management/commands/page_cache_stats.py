@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.management.base import BaseCommand
+
+from blog.cache import page_cache_stats, reset_page_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Показывает статистику попаданий в кеш страниц."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true",
+            help="Обнулить счётчики после вывода.",
+        )
+
+    def handle(self, *args, reset, **options):
+        if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+            self.stderr.write(
+                "Кеш LocMemCache свой у каждого процесса: счётчики ниже "
+                "относятся только к этой команде. Задайте общий кеш "
+                "(DJANGO_CACHE_BACKEND), чтобы видеть статистику сервера."
+            )
+        elif not isinstance(caches[DEFAULT_CACHE_ALIAS], BaseMemcachedCache):
+            self.stderr.write(
+                "Процессы сервера переносят счётчики в кеш пачками по "
+                f"{settings.BLOG_PAGE_CACHE_STATS_BATCH}, последние "
+                "запросы могут быть ещё не учтены."
+            )
+        stats = page_cache_stats()
+        self.stdout.write(
+            f"Попаданий: {stats['hits']}, промахов: {stats['misses']}, "
+            f"доля попаданий: {stats['hit_ratio']:.1%}"
+        )
+        if reset:
+            reset_page_cache_stats()
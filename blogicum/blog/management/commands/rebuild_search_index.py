@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Заново строит поисковый индекс публикаций."
+
+    def handle(self, *args, **options):
+        get_search_backend().rebuild()
+        self.stdout.write("Поисковый индекс перестроен.")
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils.timezone import now
+
+from blog.cache import bump_content_version
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает счётчики комментариев и исправляет расхождения."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Сколько публикаций обновлять за один запрос.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Только показать число расхождений, ничего не меняя.",
+        )
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        drifted = (
+            Post.objects
+            .annotate(actual_count=Count("comments"))
+            .exclude(comment_count=F("actual_count"))
+            .only("id", "comment_count", "updated_at")
+            .order_by("pk")
+        )
+        found = 0
+        repaired_at = now()
+        last_pk = 0
+        # Пакеты выбираются по возрастанию id и записываются сразу, так что
+        # в памяти не больше batch_size постов, а курсор чтения не открыт
+        # во время записи.
+        while True:
+            posts = list(drifted.filter(pk__gt=last_pk)[:batch_size])
+            if not posts:
+                break
+            last_pk = posts[-1].pk
+            found += len(posts)
+            if dry_run:
+                continue
+            for post in posts:
+                post.comment_count = post.actual_count
+                # Новый updated_at сбрасывает закешированную карточку поста
+                # так же, как invalidate_post_cards(), но без лишнего
+                # запроса.
+                post.updated_at = repaired_at
+            with transaction.atomic():
+                Post.objects.bulk_update(
+                    posts, ["comment_count", "updated_at"],
+                    batch_size=batch_size,
+                )
+
+        if not dry_run and found:
+            bump_content_version()
+
+        self.stdout.write(
+            f"Расхождений найдено: {found}"
+            + (" (без изменений)" if dry_run else ", исправлено.")
+        )
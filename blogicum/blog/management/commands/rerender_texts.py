@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.cache import bump_content_version, invalidate_post_cards
+from blog.models import Comment, Post
+from blog.rendering import stale_rendered
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает сохранённый HTML публикаций и комментариев, "
+        "отрисованный устаревшей версией правил (RENDERER_VERSION)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Сколько записей обновлять за одну транзакцию.",
+        )
+        parser.add_argument(
+            "--all", action="store_true", dest="everything",
+            help="Пересчитать все записи, а не только устаревшие.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Только показать число устаревших записей.",
+        )
+
+    def handle(self, *args, batch_size, everything, dry_run, **options):
+        changed = False
+        for model in (Post, Comment):
+            stale = model.objects.order_by("pk")
+            if not everything:
+                stale = stale.filter(stale_rendered())
+            if dry_run:
+                count = stale.count()
+            else:
+                count = self.rerender(model, stale, batch_size)
+                changed = changed or bool(count)
+            self.stdout.write(
+                f"{model._meta.verbose_name_plural}: {count}"
+                + (" (без изменений)" if dry_run else "")
+            )
+        if changed:
+            bump_content_version()
+
+    def rerender(self, model, stale, batch_size):
+        count = 0
+        last_pk = 0
+        while True:
+            # Окна по первичному ключу: обновлённые строки выпадают из
+            # выборки устаревших, а смещение при этом не сбивается.
+            batch = list(
+                stale.filter(pk__gt=last_pk).only("pk", "text")[:batch_size]
+            )
+            if not batch:
+                return count
+            for obj in batch:
+                obj.update_rendered()
+            with transaction.atomic():
+                model.objects.bulk_update(batch, model.rendered_fields)
+            if model is Post:
+                invalidate_post_cards([post.pk for post in batch])
+            last_pk = batch[-1].pk
+            count += len(batch)
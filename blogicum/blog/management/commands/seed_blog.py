@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.dataset import (
+    DATASET_PASSWORD, DatasetGenerator, add_dataset_arguments,
+    dataset_options,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет базу синтетическими пользователями, категориями, "
+        "местоположениями, публикациями и комментариями."
+    )
+
+    def add_arguments(self, parser):
+        add_dataset_arguments(parser)
+
+    def handle(self, *args, **options):
+        created = DatasetGenerator(**dataset_options(options)).generate()
+        for name, count in created.items():
+            self.stdout.write(f"{name}: {count}")
+        self.stdout.write(f"Пароль пользователей: {DATASET_PASSWORD}")
@@ -0,0 +1,144 @@
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from time import perf_counter
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from blog.models import Category, Comment, Post, User
+
+STRESS_ALIAS = "stress_sqlite"
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагружает SQLite параллельными авторами комментариев: сначала "
+        "с настройками соединения Django по умолчанию, затем с PRAGMA и "
+        "режимом транзакций из DATABASES. Каждый прогон идёт на отдельной "
+        "временной базе."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument(
+            "--comments", type=int, default=100,
+            help="Сколько комментариев добавляет каждый поток.",
+        )
+        parser.add_argument(
+            "--readers", type=int, default=2,
+            help="Потоки, параллельно читающие ленту.",
+        )
+
+    def handle(self, *args, writers, comments, readers, **options):
+        default = connections["default"].settings_dict
+        if default["ENGINE"] != "blogicum.backends.sqlite3":
+            raise CommandError("Команда рассчитана на движок SQLite.")
+        profiles = (
+            ("Django по умолчанию", {"PRAGMAS": {}, "TRANSACTION_MODE": None}),
+            ("Настройки проекта", {
+                "PRAGMAS": default.get("PRAGMAS", {}),
+                "TRANSACTION_MODE": default.get("TRANSACTION_MODE"),
+            }),
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            for number, (title, overrides) in enumerate(profiles):
+                alias = f"{STRESS_ALIAS}_{number}"
+                connections.databases[alias] = {
+                    **default,
+                    **overrides,
+                    "NAME": str(Path(directory) / f"{alias}.sqlite3"),
+                    "CONN_MAX_AGE": None,
+                    "TEST": {},
+                }
+                try:
+                    call_command("migrate", database=alias, verbosity=0)
+                    result = self.run(alias, writers, comments, readers)
+                finally:
+                    connections[alias].close()
+                self.report(title, *result)
+
+    def run(self, alias, writers, comments, readers):
+        # bulk_create не вызывает сигналы, которые работают с базой
+        # по умолчанию (поисковый индекс, сброс кеша).
+        author, = User.objects.using(alias).bulk_create([
+            User(pk=1, username="stress")
+        ])
+        category, = Category.objects.using(alias).bulk_create([
+            Category(
+                pk=1, title="Нагрузка", description="Нагрузка",
+                slug="stress",
+            )
+        ])
+        post, = Post.objects.using(alias).bulk_create([
+            Post(
+                pk=1, title="Нагрузка", text="Нагрузка", pub_date=now(),
+                author=author, category=category,
+            )
+        ])
+        writing = True
+
+        def write():
+            written = failed = 0
+            try:
+                for number in range(comments):
+                    # Как create_comment: проверка поста, затем две записи.
+                    try:
+                        with transaction.atomic(using=alias):
+                            Post.objects.using(alias).get(pk=post.pk)
+                            Comment.objects.using(alias).bulk_create([
+                                Comment(
+                                    post=post, author=author,
+                                    text=f"Комментарий {number}",
+                                )
+                            ])
+                            Post.objects.using(alias).filter(
+                                pk=post.pk
+                            ).update(comment_count=F("comment_count") + 1)
+                        written += 1
+                    except OperationalError:
+                        failed += 1
+            finally:
+                connections[alias].close()
+            return written, failed
+
+        def read():
+            reads = 0
+            try:
+                while writing:
+                    list(Post.objects.using(alias).select_related(
+                        "author", "category"
+                    ).order_by("-pub_date")[:10])
+                    reads += 1
+            except OperationalError:
+                pass
+            finally:
+                connections[alias].close()
+            return reads
+
+        started = perf_counter()
+        with ThreadPoolExecutor(max_workers=writers + readers) as executor:
+            reader_futures = [executor.submit(read) for _ in range(readers)]
+            results = [
+                future.result()
+                for future in [
+                    executor.submit(write) for _ in range(writers)
+                ]
+            ]
+            elapsed = perf_counter() - started
+            writing = False
+            reads = sum(future.result() for future in reader_futures)
+        written = sum(result[0] for result in results)
+        failed = sum(result[1] for result in results)
+        return written, failed, reads, elapsed
+
+    def report(self, title, written, failed, reads, elapsed):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        self.stdout.write(
+            f"  записано: {written}, ошибок блокировки: {failed}, "
+            f"{written / elapsed:.0f} записей/с, "
+            f"чтений ленты: {reads} за {elapsed:.2f} с"
+        )
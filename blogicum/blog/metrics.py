@@ -0,0 +1,82 @@
+"""Агрегированные метрики запросов в памяти процесса."""
+from bisect import bisect_left
+from threading import Lock
+
+# Верхние границы корзин гистограмм в миллисекундах
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+# Верхние границы корзин гистограммы числа SQL-запросов
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+TIMINGS = ("db_ms", "template_ms", "total_ms")
+
+_lock = Lock()
+_views = {}
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        # Последняя корзина — всё, что больше верхней границы.
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self, requests):
+        labels = [str(bound) for bound in self.bounds] + ["+Inf"]
+        return {
+            "mean": round(self.total / requests, 3) if requests else 0,
+            "max": round(self.max, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.timings = {name: Histogram(BUCKETS_MS) for name in TIMINGS}
+
+    def add(self, queries, **timings):
+        self.requests += 1
+        self.queries.add(queries)
+        for name, value in timings.items():
+            self.timings[name].add(value)
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "queries": self.queries.as_dict(self.requests),
+            **{
+                name: histogram.as_dict(self.requests)
+                for name, histogram in self.timings.items()
+            },
+        }
+
+
+def record(view_name, queries, db_ms, template_ms, total_ms):
+    """Добавляет замер одного запроса к метрикам представления."""
+    with _lock:
+        metrics = _views.get(view_name)
+        if metrics is None:
+            metrics = _views[view_name] = ViewMetrics()
+        metrics.add(
+            queries, db_ms=db_ms, template_ms=template_ms, total_ms=total_ms
+        )
+
+
+def snapshot():
+    with _lock:
+        return {
+            view_name: metrics.as_dict()
+            for view_name, metrics in sorted(_views.items())
+        }
+
+
+def reset():
+    with _lock:
+        _views.clear()
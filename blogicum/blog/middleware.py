@@ -0,0 +1,117 @@
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import Template
+
+from . import metrics
+
+_current_timer = ContextVar("blog_request_timer", default=None)
+
+
+class RequestTimer:
+    """Счётчики одного запроса: SQL-запросы, время БД и рендеринга."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+        self.rendering = False
+
+    def execute(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += perf_counter() - started
+            self.queries += 1
+
+
+def _timed_render(render):
+    @wraps(render)
+    def wrapper(*args, **kwargs):
+        timer = _current_timer.get()
+        # Вложенный рендеринг уже учтён во внешнем.
+        if timer is None or timer.rendering:
+            return render(*args, **kwargs)
+        timer.rendering = True
+        started = perf_counter()
+        try:
+            return render(*args, **kwargs)
+        finally:
+            timer.template += perf_counter() - started
+            timer.rendering = False
+
+    wrapper.timed = True
+    return wrapper
+
+
+def _install_template_timer():
+    if not getattr(Template.render, "timed", False):
+        Template.render = _timed_render(Template.render)
+
+
+def _milliseconds(seconds):
+    return round(seconds * 1000, 3)
+
+
+class RequestMetricsMiddleware:
+    """Считает SQL-запросы и время обработки запроса по представлениям.
+
+    Копит гистограммы в памяти процесса (см. blog.metrics) и добавляет
+    заголовок Server-Timing для персонала или, при BLOG_SERVER_TIMING_PUBLIC,
+    для всех. Время рендеринга включает запросы, выполненные во время
+    рендеринга. При BLOG_REQUEST_METRICS = False Django исключает
+    middleware из цепочки обработки.
+    """
+
+    def __init__(self, get_response):
+        if not settings.BLOG_REQUEST_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        _install_template_timer()
+
+    def __call__(self, request):
+        timer = RequestTimer()
+        token = _current_timer.set(timer)
+        started = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timer.execute)
+                    )
+                response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        total = perf_counter() - started
+
+        match = request.resolver_match
+        metrics.record(
+            match.view_name if match else "<unresolved>",
+            queries=timer.queries,
+            db_ms=_milliseconds(timer.db),
+            template_ms=_milliseconds(timer.template),
+            total_ms=_milliseconds(total),
+        )
+        if self.show_timing(request):
+            response["Server-Timing"] = (
+                f'db;dur={_milliseconds(timer.db)};'
+                f'desc="{timer.queries} SQL", '
+                f"tpl;dur={_milliseconds(timer.template)}, "
+                f"total;dur={_milliseconds(total)}"
+            )
+        return response
+
+    @staticmethod
+    def show_timing(request):
+        # Число запросов и время ответа помогают подбирать медленные
+        # адреса, поэтому посетителям они по умолчанию не показываются.
+        if settings.BLOG_SERVER_TIMING_PUBLIC:
+            return True
+        user = getattr(request, "user", None)
+        return user is not None and user.is_staff
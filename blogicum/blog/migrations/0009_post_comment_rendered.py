@@ -0,0 +1,23 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='rendered',
+            field=models.JSONField(default=dict, editable=False, verbose_name='Отрисованный HTML'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='rendered',
+            field=models.JSONField(default=dict, editable=False, verbose_name='Отрисованный HTML'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:12
+
+from pathlib import PurePosixPath
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def has_renditions(name):
+    path = PurePosixPath(name)
+    return all(
+        default_storage.exists(str(
+            path.parent / 'renditions' / f'{path.stem}_{rendition}.{extension}'
+        ))
+        for rendition in ('card', 'detail')
+        for extension in (path.suffix.lstrip('.'), 'webp')
+    )
+
+
+def fill_renditions_image(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.using(schema_editor.connection.alias)
+    ready = [
+        post for post in posts.exclude(image='').only('image').iterator()
+        if has_renditions(post.image.name)
+    ]
+    for post in ready:
+        post.renditions_image = post.image.name
+    posts.bulk_update(ready, ['renditions_image'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='renditions_image',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Изображение с уменьшенными копиями'),
+        ),
+        migrations.RunPython(fill_renditions_image, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,144 @@
+import base64
+import json
+from collections.abc import Sequence
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+NEXT = "next"
+PREVIOUS = "prev"
+
+
+class CursorPage(Sequence):
+    """Страница выборки, полученная по курсору."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.encode_cursor(NEXT, self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return self.paginator.encode_cursor(PREVIOUS, self.object_list[0])
+
+
+class CursorPaginator:
+    """Постраничный вывод по ключу сортировки (keyset) вместо OFFSET/LIMIT.
+
+    Стоимость любой страницы одинакова: выборка идёт от значения ключа
+    последнего (или первого) объекта соседней страницы. Полное число
+    объектов не считается, пока к ``count`` не обратятся явно.
+    """
+
+    def __init__(self, object_list, per_page, ordering=("-pub_date", "-id")):
+        self.object_list = object_list.order_by(*ordering)
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [
+            (name.lstrip("-"), name.startswith("-")) for name in ordering
+        ]
+
+    @cached_property
+    def count(self):
+        return self.object_list.order_by().count()
+
+    def encode_cursor(self, direction, obj):
+        values = [
+            self._get_field(name).value_to_string(obj)
+            for name, _ in self.fields
+        ]
+        raw = json.dumps([direction, values]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            direction, values = json.loads(raw)
+            if direction not in (NEXT, PREVIOUS):
+                raise ValueError(direction)
+            if len(values) != len(self.fields):
+                raise ValueError(values)
+            values = [
+                self._get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, values)
+            ]
+        except Exception:
+            raise InvalidPage("Некорректный курсор страницы.")
+        return direction, values
+
+    def page(self, cursor=None):
+        if not cursor:
+            objects = list(self.object_list[:self.per_page + 1])
+            return CursorPage(
+                objects[:self.per_page], self,
+                has_next=len(objects) > self.per_page,
+                has_previous=False,
+            )
+
+        direction, values = self.decode_cursor(cursor)
+        if direction == NEXT:
+            objects = list(
+                self.object_list.filter(self._after(values))
+                [:self.per_page + 1]
+            )
+            return CursorPage(
+                objects[:self.per_page], self,
+                has_next=len(objects) > self.per_page,
+                has_previous=True,
+            )
+
+        objects = list(
+            self.object_list
+            .order_by(*self._reversed_ordering())
+            .filter(self._after(values, reverse=True))
+            [:self.per_page + 1]
+        )
+        return CursorPage(
+            objects[:self.per_page][::-1], self,
+            has_next=True,
+            has_previous=len(objects) > self.per_page,
+        )
+
+    def _get_field(self, name):
+        return self.object_list.model._meta.get_field(name)
+
+    def _reversed_ordering(self):
+        return [
+            name if descending else f"-{name}"
+            for name, descending in self.fields
+        ]
+
+    def _after(self, values, reverse=False):
+        """Условие «строго после ключа» в порядке сортировки."""
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self.fields, values):
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
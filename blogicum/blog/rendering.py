@@ -0,0 +1,28 @@
+"""HTML-представление текстов публикаций и комментариев.
+
+Разметка считается один раз при сохранении и хранится рядом с исходным
+текстом вместе с RENDERER_VERSION. Если правила отрисовки меняются,
+версию нужно увеличить: устаревшие записи отрисовываются на лету, пока
+команда rerender_texts не пересчитает их пакетами.
+"""
+from django.db.models import Q
+from django.template.defaultfilters import linebreaksbr
+
+RENDERER_VERSION = 1
+
+
+def render_text(text):
+    """Полный текст: переносы строк превращаются в <br>."""
+    return linebreaksbr(text, autoescape=True)
+
+
+def stale_rendered():
+    """Условие для записей, отрисованных не текущей версией или вовсе нет.
+
+    Отдельная проверка на отсутствие ключа нужна потому, что
+    NOT (NULL = версия) в SQL не истинно.
+    """
+    return (
+        Q(rendered__version__isnull=True)
+        | ~Q(rendered__version=RENDERER_VERSION)
+    )
@@ -0,0 +1,185 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+
+FTS_TABLE = "blog_post_fts"
+SNIPPET_WORDS = 24
+# Маркеры начала и конца совпадения: в тексте публикаций их не бывает,
+# поэтому после экранирования их можно заменить на <mark>.
+MARK_START = "\x02"
+MARK_END = "\x03"
+
+WORD_RE = re.compile(r"\w+")
+
+
+def get_search_terms(query):
+    return WORD_RE.findall(query.lower())[:16]
+
+
+def highlight(snippet):
+    """Экранирует фрагмент и превращает маркеры совпадений в <mark>."""
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, "<mark>")
+        .replace(MARK_END, "</mark>")
+    )
+
+
+class SearchBackend:
+    """Поисковый индекс публикаций.
+
+    search() отбирает и упорядочивает по релевантности переданную выборку,
+    поэтому правила видимости задаёт вызывающий код; snippet() возвращает
+    фрагмент текста найденной публикации с подсвеченными совпадениями.
+    vendors — базы данных, с которыми бэкенд работает (None — с любыми).
+    """
+
+    vendors = None
+
+    def index(self, posts):
+        pass
+
+    def remove(self, post_ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def snippet(self, post, query):
+        raise NotImplementedError
+
+
+class SimpleSearchBackend(SearchBackend):
+    """Поиск через icontains без отдельного индекса."""
+
+    fields = ("title", "text", "author__username", "category__title")
+
+    def search(self, queryset, query):
+        terms = get_search_terms(query)
+        if not terms:
+            return queryset.none()
+        for term in terms:
+            condition = Q()
+            for field in self.fields:
+                condition |= Q(**{f"{field}__icontains": term})
+            queryset = queryset.filter(condition)
+        return queryset.annotate(search_snippet=F("text"))
+
+    def snippet(self, post, query):
+        text = Truncator(post.search_snippet).words(SNIPPET_WORDS)
+        terms = get_search_terms(query)
+        if terms:
+            pattern = re.compile(
+                "|".join(map(re.escape, terms)), re.IGNORECASE
+            )
+            text = pattern.sub(
+                lambda match: f"{MARK_START}{match[0]}{MARK_END}", text
+            )
+        return highlight(text)
+
+
+class SQLiteFTS5SearchBackend(SearchBackend):
+    """Полнотекстовый поиск на виртуальной таблице SQLite FTS5.
+
+    Таблица создаётся миграцией, строки в ней имеют rowid публикации.
+    Вес совпадения в заголовке выше, чем в тексте, авторе и категории.
+    """
+
+    vendors = ("sqlite",)
+    rank_sql = f"bm25({FTS_TABLE}, 10.0, 1.0, 2.0, 2.0)"
+
+    def index(self, posts):
+        rows = [
+            (
+                post.pk, post.title, post.text, post.author.username,
+                post.category.title if post.category else "",
+            )
+            for post in posts
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+                [row[:1] for row in rows],
+            )
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} "
+                "(rowid, title, text, author, category) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                rows,
+            )
+
+    def remove(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+                [(post_id,) for post_id in post_ids],
+            )
+
+    def rebuild(self):
+        from .models import Post
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        posts = Post.objects.select_related("author", "category")
+        batch = []
+        for post in posts.iterator(chunk_size=1000):
+            batch.append(post)
+            if len(batch) == 1000:
+                self.index(batch)
+                batch = []
+        self.index(batch)
+
+    def get_match_query(self, query):
+        return " ".join(f'"{term}"*' for term in get_search_terms(query))
+
+    def search(self, queryset, query):
+        match = self.get_match_query(query)
+        if not match:
+            return queryset.none()
+        # Таблица индекса присоединяется по rowid один раз: MATCH, bm25()
+        # и snippet() считаются по одной и той же найденной строке.
+        table = connection.ops.quote_name(queryset.model._meta.db_table)
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[
+                f"{FTS_TABLE}.rowid = {table}.id",
+                f"{FTS_TABLE} MATCH %s",
+            ],
+            params=[match],
+            select={
+                "search_rank": self.rank_sql,
+                "search_snippet": (
+                    f"snippet({FTS_TABLE}, -1, %s, %s, '…', %s)"
+                ),
+            },
+            select_params=(MARK_START, MARK_END, SNIPPET_WORDS),
+        ).order_by("search_rank", "-pub_date")
+
+    def snippet(self, post, query):
+        return highlight(post.search_snippet or "")
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    """Бэкенд из BLOG_SEARCH_BACKEND, если он поддерживает текущую базу.
+
+    Иначе, например FTS5 на PostgreSQL, где миграция не создаёт таблицу
+    индекса, используется SimpleSearchBackend.
+    """
+    backend_class = import_string(settings.BLOG_SEARCH_BACKEND)
+    vendors = backend_class.vendors
+    if vendors is not None and connection.vendor not in vendors:
+        backend_class = SimpleSearchBackend
+    return backend_class()
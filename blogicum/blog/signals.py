@@ -0,0 +1,108 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from .cache import (
+    bump_content_version, bump_post_versions, clear_category_cache,
+    invalidate_posts,
+)
+from .images import schedule_renditions
+from .models import Category, Comment, Location, Post, User
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F("comment_count") + 1, updated_at=now()
+        )
+        bump_post_versions([instance.post_id])
+    else:
+        # Правка меняет только страницу самого поста, счётчик в лентах тот же.
+        bump_content_version(f"post:{instance.post_id}")
+
+
+@receiver(pre_delete, sender=User)
+def discount_author_comments(sender, instance, **kwargs):
+    """Вычитает комментарии удаляемого автора из чужих постов одним UPDATE.
+
+    Его собственные посты удаляются вместе с ним, их счётчики не нужны.
+    """
+    comments = Comment.objects.filter(author=instance)
+    counts = comments.filter(post=OuterRef("pk")).order_by().values(
+        "post"
+    ).annotate(total=Count("pk")).values("total")
+    updated = Post.objects.filter(
+        pk__in=comments.values("post")
+    ).exclude(author=instance).update(
+        comment_count=Greatest(
+            F("comment_count") - Subquery(counts), Value(0)
+        ),
+        updated_at=now(),
+    )
+    if updated:
+        bump_content_version()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    # Карточку сбрасывает новый updated_at, сохранённый вместе с постом.
+    bump_content_version()
+
+
+@receiver(post_save, sender=Post)
+def process_post_image(sender, instance, raw, **kwargs):
+    if raw or not instance.image:
+        return
+    name = instance.image.name
+    if instance.renditions_image != name:
+        transaction.on_commit(
+            lambda: schedule_renditions(name, instance.pk)
+        )
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def invalidate_related_post_cards(sender, instance, **kwargs):
+    invalidate_posts(instance.posts.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def clear_categories(sender, **kwargs):
+    clear_category_cache()
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw, **kwargs):
+    if not raw:
+        get_search_backend().index([instance])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_posts(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        get_search_backend().index(
+            instance.posts.select_related("author", "category")
+        )
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_post_cards(sender, instance, update_fields, **kwargs):
+    if update_fields is None or "username" in update_fields:
+        invalidate_posts(instance.posts.values_list("pk", flat=True))
+        get_search_backend().index(
+            instance.posts.select_related("author", "category")
+        )
@@ -0,0 +1,34 @@
+from django import template
+
+from blog.images import RENDITIONS, WEBP, get_rendition_urls
+
+register = template.Library()
+
+
+@register.inclusion_tag("includes/post_image.html")
+def post_image(post, rendition):
+    """Изображение публикации с вариантами нужного размера в srcset.
+
+    Пока копии не созданы (post.renditions_image другой), выводится
+    оригинал.
+    """
+    image = post.image
+    urls = {}
+    if post.renditions_image == image.name:
+        urls = get_rendition_urls(image.name)
+    width = RENDITIONS[rendition]
+
+    def srcset(extension):
+        return ", ".join(
+            f"{urls[name][extension]} {size}w"
+            for name, size in RENDITIONS.items()
+            if extension in urls.get(name, {})
+        )
+
+    return {
+        "image": image,
+        "src": urls.get(rendition, {}).get("original", image.url),
+        "srcset": srcset("original"),
+        "webp_srcset": srcset(WEBP),
+        "sizes": f"(max-width: {width}px) 100vw, {width}px",
+    }
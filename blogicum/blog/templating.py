@@ -0,0 +1,23 @@
+from pathlib import Path
+
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+
+def precompile_templates():
+    """Компилирует все шаблоны из каталогов DIRS движков Django.
+
+    С кеширующим загрузчиком скомпилированные шаблоны остаются в памяти,
+    и первые запросы не тратят время на разбор. Синтаксическая ошибка
+    в любом шаблоне выбрасывает TemplateSyntaxError сразу при запуске.
+    Возвращает число скомпилированных шаблонов.
+    """
+    compiled = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for directory in map(Path, engine.dirs):
+            for path in sorted(directory.rglob("*.html")):
+                engine.get_template(path.relative_to(directory).as_posix())
+                compiled += 1
+    return compiled
@@ -0,0 +1,144 @@
+import struct
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from PIL import Image, UnidentifiedImageError
+
+# Сколько первых байтов файла держать в памяти в поисках заголовка;
+# у JPEG размеры ищет JPEGScanner, и этот предел к нему не относится.
+IMAGE_HEADER_LIMIT = 256 * 1024
+JPEG_SOI = b"\xff\xd8"
+# Маркеры SOF, после которых идут размеры кадра (кроме DHT, JPG и DAC)
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Маркеры без длины и содержимого: TEM, RSTn, SOI
+JPEG_STANDALONE_MARKERS = frozenset((0x01, *range(0xD0, 0xD9)))
+
+
+class JPEGScanner:
+    """Ищет размеры JPEG, переходя от сегмента к сегменту по их длинам.
+
+    Содержимое сегментов APPn и COM (EXIF, XMP, ICC-профили) не
+    накапливается, поэтому их размер не ограничен. feed() возвращает
+    (ширина, высота) или None, пока сегмент SOF не получен, и вызывает
+    ValueError, если поток не похож на JPEG.
+    """
+
+    def __init__(self):
+        self.buffer = b""
+        self.skip = 0
+
+    def feed(self, data):
+        skipped = min(self.skip, len(data))
+        self.skip -= skipped
+        self.buffer += data[skipped:]
+        while len(self.buffer) >= 4:
+            if self.buffer[0] != 0xFF:
+                raise ValueError("Ожидается маркер JPEG.")
+            marker = self.buffer[1]
+            if marker == 0xFF:
+                # Байт-заполнитель перед маркером
+                self.buffer = self.buffer[1:]
+                continue
+            if marker in JPEG_STANDALONE_MARKERS:
+                self.buffer = self.buffer[2:]
+                continue
+            if marker in JPEG_SOF_MARKERS:
+                if len(self.buffer) < 9:
+                    return None
+                height, width = struct.unpack(">HH", self.buffer[5:9])
+                return width, height
+            if marker in (0xD9, 0xDA):
+                raise ValueError("Данные изображения раньше заголовка.")
+            (length,) = struct.unpack(">H", self.buffer[2:4])
+            if length < 2:
+                raise ValueError("Неверная длина сегмента JPEG.")
+            if len(self.buffer) < 2 + length:
+                self.skip = 2 + length - len(self.buffer)
+                self.buffer = b""
+                return None
+            self.buffer = self.buffer[2 + length:]
+        return None
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """Проверяет загружаемые изображения по мере поступления данных.
+
+    Размер файла и размеры изображения проверяются по заголовку, до того
+    как файл получен целиком; сами данные передаются следующему
+    обработчику, который пишет их на диск порциями. При нарушении
+    ограничений файл пропускается, а причина сохраняется в
+    request.upload_errors для отображения в форме.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.active = field_name in settings.BLOG_IMAGE_UPLOAD_FIELDS
+        self.received = 0
+        self.header = BytesIO()
+        self.jpeg = None
+        self.header_checked = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        self.received += len(raw_data)
+        if self.received > settings.BLOG_IMAGE_UPLOAD_MAX_SIZE:
+            self.reject(
+                "Файл слишком большой: допускается не более "
+                f"{settings.BLOG_IMAGE_UPLOAD_MAX_SIZE // 1024 ** 2} МБ."
+            )
+        if not self.header_checked:
+            self.check_header(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.active and not self.header_checked:
+            self.check_header(b"", complete=True)
+
+    def check_header(self, raw_data, complete=False):
+        if self.jpeg is None and self.header.tell() == 0:
+            if raw_data.startswith(JPEG_SOI):
+                self.jpeg = JPEGScanner()
+        if self.jpeg is not None:
+            size = self.check_jpeg_header(raw_data, complete)
+        else:
+            size = self.check_image_header(raw_data, complete)
+        if size is None:
+            return
+        width, height = size
+        self.header_checked = True
+        self.header = self.jpeg = None
+        max_width, max_height = settings.BLOG_IMAGE_UPLOAD_MAX_DIMENSIONS
+        if width > max_width or height > max_height:
+            self.reject(
+                f"Изображение слишком большое: {width}×{height}, "
+                f"допускается не более {max_width}×{max_height} пикселей."
+            )
+
+    def check_jpeg_header(self, raw_data, complete):
+        try:
+            size = self.jpeg.feed(raw_data)
+        except ValueError:
+            size = None
+            complete = True
+        if size is None and complete:
+            self.reject("Загрузите правильное изображение.")
+        return size
+
+    def check_image_header(self, raw_data, complete):
+        self.header.write(raw_data[:IMAGE_HEADER_LIMIT - self.header.tell()])
+        self.header.seek(0)
+        try:
+            return Image.open(self.header).size
+        except (UnidentifiedImageError, OSError, SyntaxError):
+            if complete or self.header.tell() >= IMAGE_HEADER_LIMIT:
+                self.reject("Загрузите правильное изображение.")
+            self.header.seek(0, 2)
+            return None
+
+    def reject(self, message):
+        if not hasattr(self.request, "upload_errors"):
+            self.request.upload_errors = {}
+        self.request.upload_errors[self.field_name] = message
+        raise SkipFile(message)
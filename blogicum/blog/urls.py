@@ -4,8 +4,10 @@ from django.urls import path
 from .views import (
     IndexListView,
     post_detail,
+    post_comments,
     ProfileListView,
     CategoryPostsListView,
+    SearchListView,
     edit_profile,
     create_post,
     edit_post,
@@ -13,6 +15,7 @@ from .views import (
     create_comment,
     edit_comment,
     delete_comment,
+    request_metrics,
 )
 
 app_name = 'blog'
@@ -20,9 +23,12 @@ app_name = 'blog'
 urlpatterns = [
     path('', IndexListView.as_view(), name='index'),
     path('posts/<int:post_id>/', post_detail, name='post_detail'),
+    path('posts/<int:post_id>/comments/', post_comments,
+         name='post_comments'),
     path('category/<slug:category_slug>/',
          CategoryPostsListView.as_view(), name='category_posts'),
     path('profile/<str:username>/', ProfileListView.as_view(), name='profile'),
+    path('search/', SearchListView.as_view(), name='search'),
     path('profile/edit', edit_profile, name='edit_profile'),
     path('posts/create/', create_post, name='create_post'),
     path('posts/<int:post_id>/edit/', edit_post, name='edit_post'),
@@ -32,4 +38,5 @@ urlpatterns = [
          edit_comment, name='edit_comment'),
     path('posts/<int:post_id>/delete_comment/<int:comment_id>/',
          delete_comment, name='delete_comment'),
+    path('metrics/', request_metrics, name='request_metrics'),
 ]
@@ -1,94 +1,230 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import InvalidPage
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.utils.timezone import now
+from django.utils.http import urlencode
+from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
 from django.views.generic import ListView
 
+from . import metrics
+from .comment_queue import enqueue_comment, pending_comments, pending_marker
+from .cache import (
+    anonymous_page_cache, conditional_page, get_category_by_slug
+)
 from .forms import UserUpdateForm, PostUpdateForm, CommentUpdateForm
-from .models import Post, Category, User, Comment
+from .models import Post, User, Comment
+from .paginators import CursorPaginator
+from .search import get_search_backend
 
 PAGINATE_BY = 10
+POSTS_CURSOR_ORDERING = ("-pub_date", "-id")
+COMMENTS_PER_PAGE = 50
+COMMENTS_CURSOR_ORDERING = ("created_at", "id")
+# Карточкам ленты хватает анонса: полный текст и его HTML не загружаются
+LIST_DEFERRED_FIELDS = ("text", "rendered")
 
 
-def get_posts(posts=Post.objects, filter_published=True, select_related=True,
-              annotate=True
-              ):
+def get_posts(posts=Post.objects, filter_published=True, select_related=True):
     if filter_published:
-        posts = posts.filter(
-            is_published=True,
-            pub_date__lte=now(),
-            category__is_published=True
-        )
+        posts = posts.visible_at()
     if select_related:
         posts = posts.select_related("author", "category", "location")
-    if annotate:
-        posts = posts.annotate(comment_count=Count(
-            "comments")).order_by("-comment_count")
 
     return posts.order_by(*Post._meta.ordering)
 
 
-class IndexListView(ListView):
+def get_feed_posts(request):
+    return Post.published.all()
+
+
+def get_category_posts(request, category_slug):
+    return Post.published.filter(category__slug=category_slug)
+
+
+def get_profile_posts(request, username):
+    posts = Post.objects.filter(author__username=username)
+    if request.user.username != username:
+        posts = posts.visible_at()
+    return posts
+
+
+def get_detail_posts(request, post_id):
+    return Post.objects.visible_to(request.user).filter(id=post_id)
+
+
+class PostsListMixin:
+    """Общие настройки лент публикаций и выбор способа пагинации."""
+
     model = Post
-    template_name = "blog/index.html"
     context_object_name = "posts"
     paginate_by = PAGINATE_BY
-    queryset = get_posts()
+    cursor_kwarg = "cursor"
 
+    @method_decorator(anonymous_page_cache)
+    def dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
 
-def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    if post.author != request.user:
-        post = get_object_or_404(
-            get_posts(select_related=False, annotate=False),
-            id=post_id
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.BLOG_CURSOR_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(
+            queryset, page_size, ordering=POSTS_CURSOR_ORDERING
         )
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(
+            **kwargs, cursor_pagination=settings.BLOG_CURSOR_PAGINATION
+        )
+
+
+@method_decorator(conditional_page(get_feed_posts), name="dispatch")
+class IndexListView(PostsListMixin, ListView):
+    template_name = "blog/index.html"
+
+    def get_queryset(self):
+        return get_posts().defer(*LIST_DEFERRED_FIELDS)
+
 
+@conditional_page(
+    get_detail_posts, "pub_date", "comments__created_at",
+    etag_extra=pending_marker,
+)
+def post_detail(request, post_id):
+    post = get_object_or_404(
+        get_posts(Post.objects.visible_to(request.user),
+                  filter_published=False),
+        id=post_id
+    )
     return render(request, "blog/detail.html", {
         "post": post,
         "form": CommentUpdateForm(),
-        "comments": post.comments.all(),
+        "comments": get_comments_page(request, post),
     })
 
 
-class CategoryPostsListView(ListView):
-    model = Post
+@conditional_page(
+    get_detail_posts, "pub_date", "comments__created_at",
+    etag_extra=pending_marker,
+)
+def post_comments(request, post_id):
+    """Следующая порция комментариев поста: HTML-фрагмент или JSON."""
+    post = get_object_or_404(
+        Post.objects.visible_to(request.user).only("id"), id=post_id
+    )
+    comments = get_comments_page(request, post)
+    if request.GET.get("format") == "json":
+        return JsonResponse({
+            "comments": [
+                {
+                    "id": comment.id,
+                    "author": comment.author.username,
+                    "text": comment.text,
+                    "html": comment.body_html,
+                    "created_at": comment.created_at,
+                    "pending": getattr(comment, "pending", False),
+                }
+                for comment in comments
+            ],
+            "next_cursor": comments.next_cursor,
+        })
+    return render(request, "includes/comment_list.html", {
+        "post": post,
+        "comments": comments,
+        "fragment": True,
+    })
+
+
+def get_comments_page(request, post):
+    """Очередная порция комментариев поста вместе с их авторами."""
+    paginator = CursorPaginator(
+        post.comments.select_related("author"),
+        COMMENTS_PER_PAGE,
+        ordering=COMMENTS_CURSOR_ORDERING,
+    )
+    try:
+        page = paginator.page(request.GET.get("comments"))
+    except InvalidPage as error:
+        raise Http404(str(error))
+    if not page.has_next():
+        # Автор видит свои комментарии из очереди записи сразу.
+        page.object_list = [
+            *page.object_list, *pending_comments(post, request.user)
+        ]
+    return page
+
+
+@method_decorator(conditional_page(get_category_posts), name="dispatch")
+class CategoryPostsListView(PostsListMixin, ListView):
     template_name = "blog/category.html"
-    context_object_name = "posts"
-    paginate_by = PAGINATE_BY
 
-    def get_category(self):
-        return get_object_or_404(
-            Category,
-            slug=self.kwargs["category_slug"],
-            is_published=True
-        )
+    @cached_property
+    def category(self):
+        category = get_category_by_slug(self.kwargs["category_slug"])
+        if category is None or not category.is_published:
+            raise Http404("Категория не найдена.")
+        return category
 
     def get_queryset(self):
-        return get_posts(self.get_category().posts.all())
+        return get_posts(
+            Post.objects.filter(category=self.category)
+        ).defer(*LIST_DEFERRED_FIELDS)
 
     def get_context_data(self, *, object_list=None, **kwargs):
         return super().get_context_data(**kwargs) | {
-            'category': self.get_category()
+            'category': self.category
         }
 
 
-class ProfileListView(ListView):
-    model = Post
+@method_decorator(conditional_page(get_profile_posts), name="dispatch")
+class ProfileListView(PostsListMixin, ListView):
     template_name = "blog/profile.html"
-    context_object_name = "posts"
-    paginate_by = PAGINATE_BY
 
-    def get_author(self):
+    @cached_property
+    def author(self):
         return get_object_or_404(User, username=self.kwargs["username"])
 
     def get_queryset(self):
-        author = self.get_author()
-        filter_published = self.request.user != author
-        return get_posts(author.posts.all(), filter_published)
+        filter_published = self.request.user != self.author
+        return get_posts(
+            self.author.posts.all(), filter_published
+        ).defer(*LIST_DEFERRED_FIELDS)
 
     def get_context_data(self, *, object_list=None, **kwargs):
-        return super().get_context_data(**kwargs, profile=self.get_author())
+        return super().get_context_data(**kwargs, profile=self.author)
+
+
+class SearchListView(ListView):
+    model = Post
+    template_name = "blog/search.html"
+    context_object_name = "posts"
+    paginate_by = PAGINATE_BY
+
+    @cached_property
+    def query(self):
+        return self.request.GET.get("q", "").strip()
+
+    def get_queryset(self):
+        return get_search_backend().search(
+            get_posts().defer(*LIST_DEFERRED_FIELDS), self.query
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        backend = get_search_backend()
+        for post in context["page_obj"]:
+            post.snippet = backend.snippet(post, self.query)
+        return context | {
+            "query": self.query,
+            "page_query": urlencode({"q": self.query}) + "&",
+        }
 
 
 @login_required
@@ -98,7 +234,8 @@ def edit_post(request, post_id):
         return redirect("blog:post_detail", post_id=post.id)
 
     form = PostUpdateForm(
-        request.POST or None, request.FILES or None, instance=post
+        request.POST or None, request.FILES or None, instance=post,
+        upload_errors=getattr(request, "upload_errors", None)
     )
     if form.is_valid():
         form.save()
@@ -118,14 +255,28 @@ def delete_post(request, post_id):
     return render(request, "blog/create.html", {"post": post})
 
 
+def get_post_comment(post_id, comment_id):
+    """Комментарий к этому посту; пост при этом не загружается."""
+    return get_object_or_404(Comment, id=comment_id, post_id=post_id)
+
+
 @login_required
 def create_comment(request, post_id):
     comment_form = CommentUpdateForm(request.POST)
-    if comment_form.is_valid():
+    if not comment_form.is_valid():
+        return redirect("blog:post_detail", post_id)
+    # Достаточно узкого запроса по первичному ключу: сам пост комментарию
+    # не нужен, только его id.
+    if not Post.objects.visible_to(request.user).filter(id=post_id).exists():
+        raise Http404("Публикация не найдена.")
+    if settings.BLOG_COMMENT_WRITE_BEHIND:
+        enqueue_comment(
+            post_id, request.user, comment_form.cleaned_data["text"]
+        )
+    else:
         comment = comment_form.save(commit=False)
         comment.author = request.user
-        post = get_object_or_404(Post, id=post_id)
-        comment.post = post
+        comment.post_id = post_id
         comment.save()
 
     return redirect("blog:post_detail", post_id)
@@ -133,8 +284,8 @@ def create_comment(request, post_id):
 
 @login_required
 def edit_comment(request, post_id, comment_id):
-    comment = get_object_or_404(Comment, id=comment_id)
-    if request.user != comment.author:
+    comment = get_post_comment(post_id, comment_id)
+    if comment.author_id != request.user.pk:
         return redirect("blog:post_detail", post_id)
 
     form = CommentUpdateForm(request.POST or None, instance=comment)
@@ -149,8 +300,8 @@ def edit_comment(request, post_id, comment_id):
 
 @login_required
 def delete_comment(request, post_id, comment_id):
-    comment = get_object_or_404(Comment, id=comment_id)
-    if request.method == "POST" and comment.author == request.user:
+    comment = get_post_comment(post_id, comment_id)
+    if request.method == "POST" and comment.author_id == request.user.pk:
         comment.delete()
         return redirect("blog:post_detail", post_id)
 
@@ -159,7 +310,10 @@ def delete_comment(request, post_id, comment_id):
 
 @login_required
 def create_post(request):
-    post_form = PostUpdateForm(request.POST or None, request.FILES or None)
+    post_form = PostUpdateForm(
+        request.POST or None, request.FILES or None,
+        upload_errors=getattr(request, "upload_errors", None)
+    )
     if not post_form.is_valid():
         return render(request, "blog/create.html", {"form": post_form})
 
@@ -177,3 +331,12 @@ def edit_profile(request):
         return redirect("blog:profile", request.user.username)
 
     return render(request, "blog/user.html", {"form": user_form})
+
+
+def request_metrics(request):
+    """Гистограммы метрик запросов этого процесса по представлениям."""
+    if not settings.BLOG_REQUEST_METRICS:
+        raise Http404
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return JsonResponse({"views": metrics.snapshot()})
@@ -0,0 +1,38 @@
+class HealthCheckMixin:
+    """Проверка постоянного соединения перед повторным использованием.
+
+    Перенос CONN_HEALTH_CHECKS из Django 4.1: соединение, оставшееся
+    с прошлого запроса, проверяется через is_usable() перед первым
+    обращением к базе в новом запросе и при обрыве открывается заново,
+    а не падает с ошибкой посреди обработки.
+    """
+
+    health_check_done = False
+
+    @property
+    def health_check_enabled(self):
+        return self.settings_dict.get("CONN_HEALTH_CHECKS", False)
+
+    def connect(self):
+        super().connect()
+        # Только что открытое соединение проверять незачем.
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def close_if_health_check_failed(self):
+        if (
+            self.connection is None
+            or not self.health_check_enabled
+            or self.health_check_done
+        ):
+            return
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
@@ -0,0 +1,111 @@
+import threading
+
+import psycopg2.extras
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError
+from django.db.backends.postgresql import base
+from psycopg2.pool import ThreadedConnectionPool
+
+from ..mixins import HealthCheckMixin
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Пул соединений psycopg2, ожидающий освобождения при исчерпании.
+
+    ThreadedConnectionPool сразу падает, когда заняты все MAX_SIZE
+    соединений; здесь поток ждёт до TIMEOUT секунд. Между запросами
+    открытыми остаются не больше MIN_SIZE соединений.
+    """
+
+    def __init__(self, conn_params, min_size=1, max_size=10, timeout=30):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ImproperlyConfigured(
+                "POOL: нужно 0 <= MIN_SIZE <= MAX_SIZE и MAX_SIZE >= 1."
+            )
+        self.pool = ThreadedConnectionPool(min_size, max_size, **conn_params)
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.timeout = timeout
+
+    def getconn(self):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise OperationalError(
+                f"Нет свободных соединений в пуле за {self.timeout} с."
+            )
+        try:
+            return self.pool.getconn()
+        except Exception:
+            self.slots.release()
+            raise
+
+    def putconn(self, connection, close=False):
+        try:
+            self.pool.putconn(connection, close=close or connection.closed)
+        finally:
+            self.slots.release()
+
+
+def get_pool(alias, settings_dict, conn_params):
+    # Тестовая база того же псевдонима получает отдельный пул.
+    key = (alias, settings_dict["NAME"])
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            options = settings_dict.get("POOL", {})
+            pool = _pools[key] = ConnectionPool(
+                conn_params,
+                min_size=options.get("MIN_SIZE", 1),
+                max_size=options.get("MAX_SIZE", 10),
+                timeout=options.get("TIMEOUT", 30),
+            )
+        return pool
+
+
+class DatabaseWrapper(HealthCheckMixin, base.DatabaseWrapper):
+    """PostgreSQL с пулом соединений в процессе.
+
+    connect() берёт соединение из пула, close() возвращает его обратно,
+    поэтому CONN_MAX_AGE = 0 здесь не означает нового подключения
+    к серверу на каждый запрос.
+    """
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias, self.settings_dict, conn_params)
+        connection = pool.getconn()
+        # Соединение могло оборваться, пока лежало в пуле.
+        if self.health_check_enabled and not self._ping(connection):
+            pool.putconn(connection, close=True)
+            connection = pool.getconn()
+        # Дальше то же, что делает base.DatabaseWrapper после connect().
+        options = self.settings_dict["OPTIONS"]
+        try:
+            self.isolation_level = options["isolation_level"]
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    @staticmethod
+    def _ping(connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except psycopg2.Error:
+            return False
+        # Проверка не должна оставлять открытую транзакцию.
+        connection.rollback()
+        return True
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                get_pool(self.alias, self.settings_dict, {}).putconn(
+                    self.connection
+                )
@@ -0,0 +1,41 @@
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+from ..mixins import HealthCheckMixin
+
+PRAGMA_NAME_RE = re.compile(r"^[a-z_]+$")
+PRAGMA_VALUE_RE = re.compile(r"^-?\w+$")
+TRANSACTION_MODES = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+
+
+class DatabaseWrapper(HealthCheckMixin, base.DatabaseWrapper):
+    """SQLite с настраиваемыми PRAGMA и режимом начала транзакций.
+
+    PRAGMAS из настроек базы выполняются на каждом новом соединении.
+    TRANSACTION_MODE = "IMMEDIATE" берёт блокировку записи в начале
+    atomic(): иначе транзакция, которая сначала читает, а потом пишет,
+    получает "database is locked" сразу, не дожидаясь busy_timeout.
+    """
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict.get("PRAGMAS", {}).items():
+            if not (
+                PRAGMA_NAME_RE.match(name)
+                and PRAGMA_VALUE_RE.match(str(value))
+            ):
+                raise ImproperlyConfigured(
+                    f"Недопустимая PRAGMA SQLite: {name} = {value!r}."
+                )
+            connection.execute(f"PRAGMA {name} = {value}")
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict.get("TRANSACTION_MODE") or "DEFERRED"
+        if mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"Недопустимый TRANSACTION_MODE SQLite: {mode!r}."
+            )
+        self.cursor().execute(f"BEGIN {mode.upper()}")
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,10 +80,74 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# The backends in blogicum.backends wrap Django's own and add health checks
+# of reused connections (CONN_HEALTH_CHECKS, backported from Django 4.1);
+# 'postgresql_pool' also keeps a per-process psycopg2 connection pool
+DATABASE_ENGINES = {
+    'sqlite3': 'blogicum.backends.sqlite3',
+    'postgresql': 'blogicum.backends.postgresql',
+    'postgresql_pool': 'blogicum.backends.postgresql_pool',
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': DATABASE_ENGINES[os.environ.get('DJANGO_DB_ENGINE', 'sqlite3')],
+        'NAME': os.environ.get('DJANGO_DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'USER': os.environ.get('DJANGO_DB_USER', ''),
+        'PASSWORD': os.environ.get('DJANGO_DB_PASSWORD', ''),
+        'HOST': os.environ.get('DJANGO_DB_HOST', ''),
+        'PORT': os.environ.get('DJANGO_DB_PORT', ''),
+        # Seconds to keep a connection open across requests; 0 closes it at
+        # the end of every request (with the pool: returns it to the pool)
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': (
+            os.environ.get('DJANGO_DB_CONN_HEALTH_CHECKS', '1') == '1'
+        ),
+        # Used by the 'sqlite3' engine only: PRAGMAs run on every new
+        # connection. WAL lets readers work alongside the single writer,
+        # busy_timeout (ms) makes writers wait for the lock instead of
+        # failing, and IMMEDIATE transactions take the write lock up front
+        # so read-then-write blocks queue on it rather than deadlock
+        'PRAGMAS': {
+            'journal_mode': 'wal',
+            'synchronous': 'normal',
+            'busy_timeout': int(os.environ.get('DJANGO_DB_BUSY_TIMEOUT', 5000)),
+            'cache_size': -20000,
+            'mmap_size': 128 * 1024 ** 2,
+            'temp_store': 'memory',
+        },
+        'TRANSACTION_MODE': 'IMMEDIATE',
+        # Used by the 'postgresql_pool' engine only: MIN_SIZE connections
+        # stay open while idle, threads wait up to TIMEOUT seconds when all
+        # MAX_SIZE connections are busy
+        'POOL': {
+            'MIN_SIZE': int(os.environ.get('DJANGO_DB_POOL_MIN_SIZE', 1)),
+            'MAX_SIZE': int(os.environ.get('DJANGO_DB_POOL_MAX_SIZE', 10)),
+            'TIMEOUT': int(os.environ.get('DJANGO_DB_POOL_TIMEOUT', 30)),
+        },
+    }
+}
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# Holds the anonymous page cache with its content version and hit/miss
+# counters, and the post card fragments. 'locmem' is private to each
+# process: fine for development and tests, but with several worker
+# processes a change in one of them would not reach pages cached by the
+# others, so deployments must pick a shared backend ('database' needs
+# `manage.py createcachetable` first)
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'database': 'django.core.cache.backends.db.DatabaseCache',
+    'filesystem': 'django.core.cache.backends.filebased.FileBasedCache',
+    'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[os.environ.get('DJANGO_CACHE_BACKEND', 'locmem')],
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', ''),
     }
 }
 
@@ -136,3 +202,61 @@ LOGIN_REDIRECT_URL = 'blog:index'
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Keyset (cursor) pagination for post lists instead of page numbers
+BLOG_CURSOR_PAGINATION = False
+
+# Published-post visibility is checked against "now" rounded down to this
+# many seconds, so identical list queries within a bucket stay cacheable
+BLOG_PUBLISHED_NOW_BUCKET = 60
+
+# Full-page cache lifetime (seconds) for anonymous post lists; 0 disables it
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Without an atomic incr (database/filesystem caches) page cache hits and
+# misses are counted per process and added to the shared cache in batches
+BLOG_PAGE_CACHE_STATS_BATCH = 100
+
+# Per-process slug -> category cache lifetime (seconds); saves in this
+# process clear it immediately, the timeout bounds staleness elsewhere
+BLOG_CATEGORY_CACHE_TIMEOUT = 60
+
+# Background threads that build resized/WebP copies of uploaded post
+# images; 0 builds them synchronously in the request
+BLOG_IMAGE_WORKERS = 2
+
+# Uploads go straight to temporary files in chunks; image fields are
+# checked incrementally against the limits below before being buffered
+FILE_UPLOAD_HANDLERS = [
+    'blog.uploadhandlers.ImageUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+BLOG_IMAGE_UPLOAD_FIELDS = ('image',)
+BLOG_IMAGE_UPLOAD_MAX_SIZE = 10 * 1024 ** 2
+BLOG_IMAGE_UPLOAD_MAX_DIMENSIONS = (6000, 6000)
+
+# Full-text search backend for /search/ and the admin post search; backends
+# tied to another database vendor (FTS5 is SQLite-only) fall back to
+# blog.search.SimpleSearchBackend
+BLOG_SEARCH_BACKEND = 'blog.search.SQLiteFTS5SearchBackend'
+
+# Per-view query counts and timings: Server-Timing headers plus in-process
+# histograms at /metrics/ (staff only); when off the middleware is dropped
+BLOG_REQUEST_METRICS = False
+
+# Send the Server-Timing header to every client, not only to staff
+BLOG_SERVER_TIMING_PUBLIC = False
+
+# Compile every template under templates/ when the app starts; only useful
+# with the cached loader (see settings_production.py)
+BLOG_PRECOMPILE_TEMPLATES = False
+
+# Write-behind comments: create_comment appends to a local on-disk queue and
+# comments reach the database in batches (one insert and one counter update
+# per post); authors see their own queued comments until the batch lands
+BLOG_COMMENT_WRITE_BEHIND = False
+BLOG_COMMENT_QUEUE_PATH = BASE_DIR / 'comment_queue.sqlite3'
+BLOG_COMMENT_FLUSH_BATCH = 500
+# Seconds between background flushes in each web process; 0 leaves flushing
+# to the flush_comments management command
+BLOG_COMMENT_FLUSH_INTERVAL = 1
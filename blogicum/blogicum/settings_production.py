@@ -0,0 +1,52 @@
+"""
+Production settings for blogicum.
+
+Usage: DJANGO_SETTINGS_MODULE=blogicum.settings_production
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import ALLOWED_HOSTS, CACHE_BACKENDS, SECRET_KEY, TEMPLATES
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get(
+    'DJANGO_ALLOWED_HOSTS', ','.join(ALLOWED_HOSTS)
+).split(',')
+
+# Parse each template once per process: the cached loader keeps compiled
+# templates in memory (explicit loaders require APP_DIRS to be off)
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'debug': False,
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# Fill the template cache at startup and fail fast on syntax errors
+BLOG_PRECOMPILE_TEMPLATES = True
+
+# Every worker process must see the same page cache version and post cards;
+# the database cache needs no extra service (run createcachetable once),
+# memcached is the faster choice where it is available
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[
+            os.environ.get('DJANGO_CACHE_BACKEND', 'database')
+        ],
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', 'blog_cache'),
+    }
+}
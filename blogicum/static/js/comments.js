@@ -0,0 +1,18 @@
+// Подгружает следующую порцию комментариев вместо перехода на страницу.
+document.addEventListener('click', async (event) => {
+  const link = event.target.closest('#comments [data-comments-url]');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  const nav = link.closest('nav');
+  const response = await fetch(link.dataset.commentsUrl, {
+    headers: {'X-Requested-With': 'XMLHttpRequest'},
+  });
+  if (!response.ok) {
+    window.location.href = link.href;
+    return;
+  }
+  nav.insertAdjacentHTML('beforebegin', await response.text());
+  nav.remove();
+});
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_dataset_generator_is_reproducible():
+    from blog.dataset import DatasetGenerator
+    from blog.models import Comment, Post
+
+    DatasetGenerator(users=3, posts=40, comments=100, seed=1).generate()
+    assert Post.objects.count() == 40
+    assert Comment.objects.count() == 100
+    posts = Post.objects.order_by("id")
+    assert sum(post.comment_count for post in posts) == 100, (
+        "Убедитесь, что генератор заполняет счётчики комментариев."
+    )
+    assert 0 < Post.published.count() < 40, (
+        "Убедитесь, что генератор создаёт и видимые, и скрытые публикации."
+    )
+    first_titles = list(posts.values_list("title", flat=True))
+
+    Post.objects.all().delete()
+    DatasetGenerator(users=3, posts=40, comments=100, seed=1).generate()
+    assert list(
+        Post.objects.order_by("id").values_list("title", flat=True)
+    ) == first_titles, (
+        "Убедитесь, что при одинаковом seed генератор создаёт те же данные."
+    )
+
+
+@pytest.mark.django_db
+def test_benchmark_covers_every_url(tmp_path):
+    from django.core.cache import cache
+
+    from blog import urls as blog_urls
+    from pages import urls as pages_urls
+
+    cache.set("benchmark_canary", 1)
+    output = tmp_path / "report.json"
+    call_command(
+        "benchmark_urls", "--generate", "--users=3", "--posts=20",
+        "--comments=40", "--repeat=1", f"--output={output}",
+    )
+    report = json.loads(output.read_text(encoding="utf-8"))
+
+    expected = {
+        f"{module.app_name}:{pattern.name}"
+        for module in (blog_urls, pages_urls)
+        for pattern in module.urlpatterns
+    }
+    assert cache.get("benchmark_canary") == 1, (
+        "Убедитесь, что benchmark_urls не очищает общий кеш сервера."
+    )
+    measured = {result["name"] for result in report["results"]}
+    assert measured == expected, (
+        "Убедитесь, что benchmark_urls замеряет все адреса приложений"
+        " blog и pages."
+    )
+    for result in report["results"]:
+        assert result["status"] < 500, (
+            f"Страница {result['path']} вернула ошибку при замере."
+        )
+        assert {"queries", "cold_ms", "p50_ms", "memory_peak_kib"} <= set(
+            result
+        )
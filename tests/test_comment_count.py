@@ -0,0 +1,143 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+
+def count_queries(action):
+    queries = []
+
+    def log(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(log):
+        action()
+    return len(queries)
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_comments(
+        mixer, post_with_published_location, another_user
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(
+        "blog.Comment", post=post, author=another_user
+    )
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что счётчик комментариев публикации увеличивается"
+        " при добавлении комментария."
+    )
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что счётчик комментариев публикации уменьшается"
+        " при удалении комментария."
+    )
+
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что счётчик комментариев публикации уменьшается"
+        " при каскадном удалении комментариев."
+    )
+
+
+@pytest.mark.django_db
+def test_queryset_delete_updates_comment_counts(
+        mixer, post_with_published_location, another_user
+):
+    from blog.models import Comment
+
+    post = post_with_published_location
+    mixer.cycle(4).blend("blog.Comment", post=post, author=another_user)
+    Comment.objects.filter(pk__in=Comment.objects.values("pk")[:3]).delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что удаление комментариев выборкой (например, в"
+        " админке) уменьшает счётчик."
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("comments", [10, 300])
+def test_cascade_delete_does_not_scale_with_comments(
+        mixer, user, another_user, published_category, published_location,
+        comments
+):
+    from blog.models import Comment, Post
+
+    own, foreign = mixer.cycle(2).blend(
+        "blog.Post", author=(author for author in (user, another_user)),
+        category=published_category, location=published_location,
+    )
+    Comment.objects.bulk_create(
+        Comment(post=post, author=author, text="Комментарий")
+        for post in (own, foreign)
+        for author in (user, another_user)
+        for _ in range(comments // 2)
+    )
+    Post.objects.filter(pk__in=(own.pk, foreign.pk)).update(
+        comment_count=comments
+    )
+
+    queries = count_queries(own.delete)
+    assert queries <= 5, (
+        "Убедитесь, что при удалении поста его комментарии удаляются"
+        f" без запроса на каждый комментарий (выполнено {queries})."
+    )
+
+    queries = count_queries(user.delete)
+    assert queries <= 10, (
+        "Убедитесь, что при удалении автора счётчики чужих постов"
+        f" обновляются одним запросом (выполнено {queries})."
+    )
+    foreign.refresh_from_db()
+    assert foreign.comment_count == comments // 2
+    assert Comment.objects.filter(post=foreign).count() == comments // 2
+
+
+@pytest.mark.django_db
+def test_recount_comments_repairs_drift(
+        client, mixer, post_with_published_location, user
+):
+    from blog.models import Post
+
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    assert "Комментарии (42)" in client.get("/").content.decode()
+
+    call_command("recount_comments", stdout=StringIO())
+
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что команда `recount_comments` исправляет"
+        " рассинхронизированные счётчики комментариев."
+    )
+    assert "Комментарии (2)" in client.get("/").content.decode(), (
+        "Убедитесь, что после исправления счётчиков закешированные"
+        " карточки и страницы сбрасываются."
+    )
+
+
+@pytest.mark.django_db
+def test_recount_comments_works_in_batches(mixer, user, published_category):
+    from blog.models import Post
+
+    posts = mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category,
+        comment_count=3,
+    )
+    stdout = StringIO()
+    call_command("recount_comments", "--batch-size=2", stdout=stdout)
+    assert "Расхождений найдено: 5" in stdout.getvalue()
+    assert not Post.objects.filter(
+        pk__in=[post.pk for post in posts], comment_count__gt=0
+    ).exists(), (
+        "Убедитесь, что `recount_comments` исправляет все посты, даже если"
+        " их больше, чем --batch-size."
+    )
@@ -0,0 +1,181 @@
+import pytest
+
+
+@pytest.fixture
+def write_behind(settings, tmp_path):
+    settings.BLOG_COMMENT_WRITE_BEHIND = True
+    settings.BLOG_COMMENT_FLUSH_INTERVAL = 0
+    settings.BLOG_COMMENT_QUEUE_PATH = tmp_path / "queue.sqlite3"
+
+
+@pytest.mark.django_db
+def test_comment_is_queued_and_shown_to_author(
+        write_behind, client, user_client, another_user,
+        post_with_published_location
+):
+    from django.test import Client
+
+    from blog.models import Comment
+
+    post = post_with_published_location
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", {"text": "Из очереди"}
+    )
+    assert response.status_code == 302
+    assert not Comment.objects.exists(), (
+        "Убедитесь, что при отложенной записи комментарий сначала попадает"
+        " в очередь, а не в базу."
+    )
+    assert "Из очереди" in user_client.get(
+        f"/posts/{post.id}/"
+    ).content.decode(), (
+        "Убедитесь, что автор сразу видит свой комментарий из очереди."
+    )
+
+    other = Client()
+    other.force_login(another_user)
+    assert "Из очереди" not in other.get(f"/posts/{post.id}/").content.decode()
+    assert "Из очереди" not in client.get(f"/posts/{post.id}/").content.decode()
+
+
+@pytest.mark.django_db
+def test_comment_queue_etag_changes_for_author(
+        write_behind, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    etag = user_client.get(f"/posts/{post.id}/")["ETag"]
+    user_client.post(f"/posts/{post.id}/comment/", {"text": "Новый"})
+    response = user_client.get(
+        f"/posts/{post.id}/", HTTP_IF_NONE_MATCH=etag
+    )
+    assert response.status_code == 200, (
+        "Убедитесь, что ETag страницы поста учитывает комментарии автора"
+        " в очереди."
+    )
+
+
+@pytest.mark.django_db
+def test_flush_writes_batch_and_updates_counter(
+        write_behind, user_client, post_with_published_location
+):
+    from django.core.management import call_command
+
+    from blog.comment_queue import get_comment_queue
+    from blog.models import Comment, Post
+
+    post = post_with_published_location
+    for number in range(5):
+        user_client.post(
+            f"/posts/{post.id}/comment/", {"text": f"Комментарий {number}"}
+        )
+    user_client.post(f"/posts/{post.id + 100}/comment/", {"text": "Нет"})
+    submitted = [
+        row["created_at"]
+        for row in get_comment_queue().pending_for(post.id, post.author.id)
+    ]
+
+    call_command("flush_comments", batch_size=2, verbosity=0)
+
+    assert list(
+        Comment.objects.order_by("id").values_list("text", flat=True)
+    ) == [f"Комментарий {number}" for number in range(5)], (
+        "Убедитесь, что очередь переносится в базу по порядку и полностью."
+    )
+    assert list(
+        Comment.objects.order_by("id").values_list("created_at", flat=True)
+    ) == submitted, (
+        "Убедитесь, что комментарий из очереди сохраняет время отправки."
+    )
+    assert Post.objects.get(pk=post.pk).comment_count == 5
+    assert get_comment_queue().size() == 0
+
+    content = user_client.get(f"/posts/{post.id}/").content.decode()
+    assert content.count("Комментарий ") == 5, (
+        "Убедитесь, что записанный комментарий не показывается дважды."
+    )
+
+
+@pytest.mark.django_db
+def test_flush_skips_comments_of_deleted_posts(
+        write_behind, user_client, post_with_published_location
+):
+    from blog.comment_queue import flush_comment_queue, get_comment_queue
+    from blog.models import Comment
+
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.id}/comment/", {"text": "Потерянный"})
+    post.delete()
+    assert flush_comment_queue() == 1
+    assert not Comment.objects.exists()
+    assert get_comment_queue().size() == 0
+
+
+@pytest.mark.django_db
+def test_only_one_flusher_holds_the_lease(write_behind):
+    from blog.comment_queue import get_comment_queue
+
+    queue = get_comment_queue()
+    assert queue.acquire_lease("first")
+    assert not queue.acquire_lease("second"), (
+        "Убедитесь, что очередь одновременно переносит только один поток."
+    )
+    queue.release_lease("first")
+    assert queue.acquire_lease("second")
+
+
+def test_flusher_survives_errors_and_is_restarted(
+        write_behind, settings, monkeypatch
+):
+    import threading
+
+    from django.db import OperationalError
+
+    from blog import comment_queue
+
+    settings.BLOG_COMMENT_FLUSH_INTERVAL = 0.01
+    calls = []
+    retried = threading.Event()
+
+    def failing_flush(batch_size=None):
+        calls.append(batch_size)
+        if len(calls) > 1:
+            retried.set()
+        raise OperationalError("database is locked")
+
+    monkeypatch.setattr(comment_queue, "flush_comment_queue", failing_flush)
+    monkeypatch.setattr(comment_queue, "_flusher", None)
+    flusher = comment_queue.get_flusher()
+    try:
+        assert retried.wait(5), (
+            "Убедитесь, что фоновая запись комментариев продолжает попытки"
+            " после ошибки."
+        )
+        assert flusher.is_alive()
+        assert comment_queue.get_flusher() is flusher
+    finally:
+        flusher.stop()
+        flusher.join(5)
+
+    assert not flusher.is_alive()
+    restarted = comment_queue.get_flusher()
+    try:
+        assert restarted is not flusher and restarted.is_alive(), (
+            "Убедитесь, что остановившийся поток записи запускается заново."
+        )
+    finally:
+        restarted.stop()
+        restarted.join(5)
+
+
+@pytest.mark.django_db
+def test_put_reports_queue_length(write_behind, user, another_user):
+    from blog.comment_queue import get_comment_queue
+
+    queue = get_comment_queue()
+    assert [queue.put(1, user.pk, str(number)) for number in range(3)] == [
+        1, 2, 3
+    ]
+    queue.delete_through(queue.take(2)[-1][0])
+    assert queue.put(1, another_user.pk, "ещё") == queue.size() == 2, (
+        "Убедитесь, что put возвращает длину очереди после частичной записи."
+    )
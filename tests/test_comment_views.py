@@ -0,0 +1,74 @@
+import pytest
+from django.db import connection
+
+
+@pytest.mark.django_db
+def test_create_comment_checks_post_without_loading_it(
+        user_client, post_with_published_location
+):
+    from blog.models import Comment
+
+    post = post_with_published_location
+    queries = []
+
+    def log(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(log):
+        response = user_client.post(
+            f"/posts/{post.id}/comment/", {"text": "Узкий запрос"}
+        )
+    assert response.status_code == 302
+    assert Comment.objects.get().post_id == post.id
+    post_queries = [
+        sql for sql in queries if 'FROM "blog_post"' in sql
+    ]
+    assert post_queries and all(
+        '"blog_post"."text"' not in sql for sql in post_queries
+    ), (
+        "Убедитесь, что при добавлении комментария пост не загружается"
+        " целиком: достаточно проверить, что он существует и виден."
+    )
+
+
+@pytest.mark.django_db
+def test_create_comment_requires_visible_post(
+        user_client, another_user, post_with_published_location
+):
+    from blog.models import Comment
+
+    post = post_with_published_location
+    post.author = another_user
+    post.is_published = False
+    post.save()
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", {"text": "Скрытый пост"}
+    )
+    assert response.status_code == 404, (
+        "Убедитесь, что нельзя комментировать недоступную публикацию."
+    )
+    assert not Comment.objects.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("action", ["edit_comment", "delete_comment"])
+def test_comment_must_belong_to_post_in_url(
+        mixer, user, user_client, published_category, published_location,
+        action
+):
+    from blog.models import Comment
+
+    first, second = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, is_published=True,
+    )
+    comment = mixer.blend("blog.Comment", post=first, author=user)
+    response = user_client.post(
+        f"/posts/{second.id}/{action}/{comment.id}/", {"text": "Чужой пост"}
+    )
+    assert response.status_code == 404, (
+        "Убедитесь, что комментарий ищется только среди комментариев поста"
+        " из адреса."
+    )
+    assert Comment.objects.filter(pk=comment.pk, post=first).exists()
@@ -0,0 +1,78 @@
+import pytest
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location, another_user):
+    from blog.views import COMMENTS_PER_PAGE
+
+    return mixer.cycle(COMMENTS_PER_PAGE * 2 + 5).blend(
+        "blog.Comment", post=post_with_published_location,
+        author=another_user,
+    )
+
+
+@pytest.mark.django_db
+def test_comment_windows_are_loaded_by_cursor(
+        client, post_with_published_location, many_comments
+):
+    from blog.views import COMMENTS_PER_PAGE
+
+    post = post_with_published_location
+    ordered = sorted(many_comments, key=lambda c: (c.created_at, c.id))
+
+    response = client.get(f"/posts/{post.id}/comments/?format=json")
+    assert response.status_code == 200
+    data = response.json()
+    assert [c["id"] for c in data["comments"]] == [
+        c.id for c in ordered[:COMMENTS_PER_PAGE]
+    ], "Убедитесь, что комментарии отдаются окнами по created_at и id."
+
+    seen = [c["id"] for c in data["comments"]]
+    while data["next_cursor"]:
+        data = client.get(
+            f"/posts/{post.id}/comments/?format=json"
+            f"&comments={data['next_cursor']}"
+        ).json()
+        assert len(data["comments"]) <= COMMENTS_PER_PAGE
+        seen += [c["id"] for c in data["comments"]]
+    assert seen == [c.id for c in ordered], (
+        "Убедитесь, что последовательные окна комментариев не теряют и не"
+        " повторяют комментарии."
+    )
+
+
+@pytest.mark.django_db
+def test_comment_fragment_links_to_next_window(
+        client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    detail = client.get(f"/posts/{post.id}/").content.decode()
+    assert f"/posts/{post.id}/comments/?comments=" in detail, (
+        "Убедитесь, что страница поста ссылается на подгрузку следующих"
+        " комментариев."
+    )
+
+    fragment = client.get(f"/posts/{post.id}/comments/")
+    content = fragment.content.decode()
+    assert "<html" not in content, (
+        "Убедитесь, что адрес подгрузки комментариев отдаёт фрагмент"
+        " без общего шаблона страницы."
+    )
+    assert content.count('name="comment_') == len(
+        fragment.context["comments"]
+    )
+    assert "data-comments-url" in content
+
+
+@pytest.mark.django_db
+def test_comment_windows_respect_post_visibility(
+        client, user_client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert client.get(f"/posts/{post.id}/comments/").status_code == 404
+    assert user_client.get(f"/posts/{post.id}/comments/").status_code == 200
+    assert client.get(
+        f"/posts/{post.id + 1}/comments/?comments=broken"
+    ).status_code == 404
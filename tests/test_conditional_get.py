@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_template", [
+    "/", "/posts/{post.id}/", "/category/{post.category.slug}/",
+    "/profile/{post.author.username}/",
+])
+def test_conditional_get_returns_not_modified(
+        client, post_with_published_location, url_template
+):
+    post = post_with_published_location
+    url = url_template.format(post=post)
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert all(map(response.has_header, ("ETag", "Last-Modified"))), (
+        f"Убедитесь, что страница `{url}` отдаёт заголовки ETag"
+        " и Last-Modified."
+    )
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        f"Убедитесь, что страница `{url}` отвечает 304, если ETag совпадает."
+    )
+
+
+@pytest.mark.django_db
+def test_etag_changes_with_content(
+        client, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    etag = client.get(url)["ETag"]
+
+    mixer.blend("blog.Comment", post=post, author=user)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после добавления комментария ETag страницы поста"
+        " меняется и страница отдаётся заново."
+    )
+
+
+@pytest.mark.django_db
+def test_etag_differs_between_users(
+        client, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    etag = client.get("/")["ETag"]
+    response = user_client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert not response.has_header("Last-Modified")
@@ -0,0 +1,52 @@
+import pytest
+from django.db import connection
+
+
+def make_wrapper(tmp_path, health_checks):
+    from blogicum.backends.sqlite3.base import DatabaseWrapper
+
+    return DatabaseWrapper({
+        **connection.settings_dict,
+        "NAME": str(tmp_path / "health.sqlite3"),
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": health_checks,
+    }, alias="health")
+
+
+def test_default_database_keeps_connections(settings):
+    database = settings.DATABASES["default"]
+    assert database["ENGINE"].startswith("blogicum.backends.")
+    assert database["CONN_MAX_AGE"] > 0, (
+        "Убедитесь, что соединения с базой по умолчанию не закрываются"
+        " после каждого запроса."
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("health_checks", [True, False])
+def test_broken_connection_is_replaced_on_reuse(
+        tmp_path, monkeypatch, health_checks
+):
+    wrapper = make_wrapper(tmp_path, health_checks)
+    try:
+        wrapper.cursor().execute("SELECT 1")
+        first = wrapper.connection
+        # Граница запроса: постоянное соединение остаётся открытым.
+        wrapper.close_if_unusable_or_obsolete()
+        assert wrapper.connection is first
+
+        monkeypatch.setattr(wrapper, "is_usable", lambda: False)
+        wrapper.cursor().execute("SELECT 1")
+        assert (wrapper.connection is not first) == health_checks, (
+            "Убедитесь, что при CONN_HEALTH_CHECKS оборванное соединение"
+            " заменяется новым при первом обращении в запросе."
+        )
+
+        checks = []
+        monkeypatch.setattr(wrapper, "is_usable", lambda: checks.append(1))
+        wrapper.cursor().execute("SELECT 1")
+        assert not checks, (
+            "Убедитесь, что соединение проверяется не чаще раза за запрос."
+        )
+    finally:
+        wrapper.close()
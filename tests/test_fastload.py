@@ -0,0 +1,84 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+def write_fixture(path, title):
+    path.write_text(json.dumps([
+        {"model": "auth.user", "pk": 1, "fields": {
+            "username": "fixture_author", "password": "!",
+        }},
+        {"model": "blog.category", "pk": 1, "fields": {
+            "title": "Категория", "description": "Описание", "slug": "cat",
+            "is_published": True, "created_at": "2020-01-01T00:00:00Z",
+        }},
+        {"model": "blog.post", "pk": 1, "fields": {
+            "title": title, "text": "Текст публикации",
+            "pub_date": "2020-01-02T00:00:00Z", "author": 1,
+            "category": 1, "location": None, "is_published": True,
+            "created_at": "2020-01-03T00:00:00Z",
+        }},
+        {"model": "blog.comment", "pk": 1, "fields": {
+            "text": "Комментарий", "post": 1, "author": 1,
+            "created_at": "2020-01-04T00:00:00Z",
+        }},
+    ]), encoding="utf-8")
+
+
+@pytest.mark.django_db
+def test_fastload_loads_fixture_in_bulk(tmp_path):
+    from blog.models import Post
+    from blog.search import get_search_backend
+
+    fixture = tmp_path / "fixture.json"
+    write_fixture(fixture, "Первая версия")
+    call_command("fastload", str(fixture), stdout=StringIO())
+
+    post = Post.objects.get()
+    assert post.created_at.isoformat() == "2020-01-03T00:00:00+00:00", (
+        "Убедитесь, что fastload сохраняет даты из фикстуры, а не"
+        " подставляет текущее время."
+    )
+    assert post.comment_count == 1, (
+        "Убедитесь, что после fastload счётчики комментариев пересчитаны."
+    )
+    assert list(
+        get_search_backend().search(Post.objects.all(), "первая")
+    ) == [post], "Убедитесь, что после fastload обновлён поисковый индекс."
+
+    write_fixture(fixture, "Вторая версия")
+    call_command("fastload", str(fixture), stdout=StringIO())
+    assert Post.objects.get().title == "Вторая версия", (
+        "Убедитесь, что повторная загрузка fastload обновляет существующие"
+        " объекты, как loaddata."
+    )
+
+
+@pytest.mark.django_db
+def test_fastload_refreshes_only_loaded_posts(
+        tmp_path, mixer, user, published_category
+):
+    from blog.models import Post
+
+    fixture = tmp_path / "fixture.json"
+    write_fixture(fixture, "Частичная загрузка")
+    call_command("fastload", str(fixture), stdout=StringIO())
+    untouched = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        comment_count=7,
+    )
+    call_command(
+        "fastload", str(fixture), "--batch-size=2000", stdout=StringIO()
+    )
+
+    assert Post.objects.get(title="Частичная загрузка").comment_count == 1
+    untouched.refresh_from_db()
+    assert untouched.comment_count == 7, (
+        "Убедитесь, что fastload без --full-refresh пересчитывает только"
+        " загруженные публикации."
+    )
+    call_command("fastload", str(fixture), "--full-refresh", stdout=StringIO())
+    untouched.refresh_from_db()
+    assert untouched.comment_count == 0
@@ -0,0 +1,91 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+
+
+@pytest.mark.django_db(transaction=True)
+def test_post_image_renditions(
+        tmp_path, client, user, published_category
+):
+    from blog.images import RENDITIONS, get_rendition_urls
+    from blog.models import Post
+
+    buffer = BytesIO()
+    Image.new("RGB", (2000, 1000), color=(73, 109, 137)).save(
+        buffer, format="JPEG"
+    )
+    with override_settings(MEDIA_ROOT=tmp_path, BLOG_IMAGE_WORKERS=0):
+        post = Post.objects.create(
+            title="С картинкой", text="Текст", author=user,
+            category=published_category, pub_date="2020-01-01T00:00Z",
+            image=SimpleUploadedFile("big.jpg", buffer.getvalue()),
+        )
+        post.refresh_from_db()
+        assert post.renditions_image == post.image.name, (
+            "Убедитесь, что пост запоминает, для какого изображения готовы"
+            " уменьшенные копии."
+        )
+        urls = get_rendition_urls(post.image.name)
+        assert set(urls) == set(RENDITIONS), (
+            "Убедитесь, что для изображения публикации создаются уменьшенные"
+            " копии всех размеров."
+        )
+        for rendition, width in RENDITIONS.items():
+            assert set(urls[rendition]) == {"original", "webp"}
+            resized = next((tmp_path / "images" / "renditions").glob(
+                f"*_{rendition}.jpg"
+            ))
+            assert Image.open(resized).size == (width, width // 2)
+
+        content = client.get(f"/posts/{post.id}/").content.decode()
+        assert 'type="image/webp"' in content
+        assert urls["detail"]["original"] in content, (
+            "Убедитесь, что страница поста использует уменьшенную копию"
+            " изображения."
+        )
+
+
+@pytest.mark.django_db
+def test_ready_renditions_refresh_cached_pages(
+        client, post_with_published_location
+):
+    from blog.images import mark_renditions_ready
+
+    post = post_with_published_location
+    client.get("/")
+    mark_renditions_ready(post.id, post.image.name)
+    response = client.get("/")
+    assert response["X-Page-Cache"] == "MISS", (
+        "Убедитесь, что после создания уменьшенных копий закешированные"
+        " страницы с постом сбрасываются."
+    )
+    assert "_card.webp" in response.content.decode()
+
+
+def test_failed_renditions_are_logged(tmp_path, settings, caplog, monkeypatch):
+    import time
+
+    from blog import images
+
+    settings.MEDIA_ROOT = tmp_path
+    settings.BLOG_IMAGE_WORKERS = 1
+    monkeypatch.setattr(images, "_executor", None)
+    (tmp_path / "broken.jpg").write_bytes(b"not an image")
+
+    future = images.schedule_renditions("broken.jpg", 1)
+    try:
+        assert future.exception(timeout=5) is not None
+        # Обработчики завершения вызываются уже после пробуждения
+        # ожидающих результат.
+        deadline = time.monotonic() + 5
+        while not caplog.records and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        images._executor.shutdown()
+    assert any(
+        "broken.jpg" in record.getMessage() and record.exc_info
+        for record in caplog.records
+    ), "Убедитесь, что ошибки фоновой обработки изображений логируются."
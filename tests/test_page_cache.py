@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+import pytest
+from django.conf import settings
+from django.utils import timezone
+
+
+@pytest.mark.django_db
+def test_anonymous_feed_is_cached_until_posts_change(
+        client, mixer, user, post_with_published_location
+):
+    from blog.cache import page_cache_stats, reset_page_cache_stats
+
+    reset_page_cache_stats()
+    assert client.get("/")["X-Page-Cache"] == "MISS"
+    assert client.get("/")["X-Page-Cache"] == "HIT", (
+        "Убедитесь, что повторный запрос ленты анонимным посетителем"
+        " отдаётся из кеша страниц."
+    )
+    assert client.get("/?page=1")["X-Page-Cache"] == "MISS", (
+        "Убедитесь, что кеш страниц различает параметр `?page=`."
+    )
+    assert page_cache_stats()["hits"] == 1
+
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = client.get("/")
+    assert response["X-Page-Cache"] == "MISS"
+    assert post.title not in response.content.decode(), (
+        "Убедитесь, что кеш страниц сбрасывается при снятии публикации."
+    )
+
+    post.is_published = True
+    post.save()
+    mixer.blend("blog.Comment", post=post, author=user)
+    assert "Комментарии (1)" in client.get("/").content.decode(), (
+        "Убедитесь, что кеш страниц сбрасывается при добавлении комментария."
+    )
+
+
+@pytest.mark.django_db
+def test_page_cache_expires_with_scheduled_post(
+        client, mixer, user, published_category
+):
+    from blog.cache import _get_page_timeout
+
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    assert _get_page_timeout() <= 30 + settings.BLOG_PUBLISHED_NOW_BUCKET, (
+        "Убедитесь, что страница хранится в кеше не дольше, чем до выхода"
+        " ближайшей отложенной публикации."
+    )
+
+
+@pytest.mark.django_db
+def test_authenticated_pages_are_not_cached(user_client):
+    response = user_client.get("/")
+    assert "X-Page-Cache" not in response
+
+
+def test_deploy_check_requires_shared_cache(settings):
+    from blog.checks import check_shared_cache
+
+    assert [message.id for message in check_shared_cache(None)] == [
+        "blog.W001"
+    ], "Убедитесь, что проверка предупреждает о кеше, своём у процесса."
+
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "blog_cache",
+        }
+    }
+    assert check_shared_cache(None) == []
+
+
+@pytest.mark.django_db
+def test_new_comment_keeps_unrelated_pages_cached(
+        client, mixer, user, post_with_published_location
+):
+    other_category = mixer.blend("blog.Category", is_published=True)
+    other_url = f"/category/{other_category.slug}/"
+    assert client.get(other_url)["X-Page-Cache"] == "MISS"
+    client.get("/")
+
+    mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+    assert client.get("/")["X-Page-Cache"] == "MISS"
+    assert client.get(other_url)["X-Page-Cache"] == "HIT", (
+        "Убедитесь, что новый комментарий сбрасывает только страницы,"
+        " на которых виден его пост."
+    )
+
+
+@pytest.mark.django_db
+def test_page_cache_stats_are_batched_without_atomic_incr(
+        client, settings, monkeypatch
+):
+    from blog import cache
+
+    settings.BLOG_PAGE_CACHE_STATS_BATCH = 3
+    monkeypatch.setattr(cache, "_has_atomic_incr", lambda: False)
+    cache.reset_page_cache_stats()
+    client.get("/")
+    client.get("/")
+    assert cache.cache.get(cache.PAGE_CACHE_HITS_KEY) is None, (
+        "Убедитесь, что без атомарного incr счётчики не пишутся в кеш"
+        " на каждом запросе."
+    )
+    stats = cache.page_cache_stats()
+    assert stats["hits"] + stats["misses"] == 2
+    client.get("/")
+    shared = cache.cache.get_many(
+        [cache.PAGE_CACHE_HITS_KEY, cache.PAGE_CACHE_MISSES_KEY]
+    )
+    assert sum(shared.values()) == 3
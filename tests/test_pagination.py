@@ -0,0 +1,54 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+from conftest import N_PER_PAGE
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_CURSOR_PAGINATION=True, BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_cursor_pagination_walks_feed(
+        client, many_posts_with_published_locations
+):
+    from blog.models import Post
+
+    expected_ids = list(
+        Post.objects.order_by("-pub_date", "-id").values_list("id", flat=True)
+    )
+    seen_ids = []
+    cursor = None
+    while True:
+        url = "/" if cursor is None else f"/?cursor={cursor}"
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        page_obj = response.context["page_obj"]
+        assert len(page_obj) <= N_PER_PAGE, (
+            "Убедитесь, что при курсорной пагинации на странице выводится"
+            f" не больше {N_PER_PAGE} публикаций."
+        )
+        seen_ids += [post.id for post in page_obj]
+        if not page_obj.has_next():
+            break
+        cursor = page_obj.next_cursor
+    assert seen_ids == expected_ids, (
+        "Убедитесь, что курсорная пагинация выводит все публикации ленты"
+        " по одному разу и в порядке сортировки."
+    )
+
+    response = client.get(f"/?cursor={cursor}")
+    previous = response.context["page_obj"].previous_cursor
+    response = client.get(f"/?cursor={previous}")
+    assert [post.id for post in response.context["page_obj"]] == (
+        expected_ids[:N_PER_PAGE]
+    ), (
+        "Убедитесь, что ссылка на предыдущую страницу при курсорной"
+        " пагинации возвращает к предыдущей порции публикаций."
+    )
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_CURSOR_PAGINATION=True, BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_cursor_pagination_rejects_broken_cursor(client):
+    response = client.get("/?cursor=not-a-cursor")
+    assert response.status_code == HTTPStatus.NOT_FOUND
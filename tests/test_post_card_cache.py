@@ -0,0 +1,62 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_post_card_cache_invalidation(
+        client, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    category = post.category
+    assert post.title in client.get("/").content.decode()
+
+    post.title = "Обновлённый заголовок"
+    post.save()
+    assert "Обновлённый заголовок" in client.get("/").content.decode(), (
+        "Убедитесь, что закешированная карточка публикации обновляется"
+        " после изменения публикации."
+    )
+
+    category.title = "Обновлённая категория"
+    category.save()
+    assert "Обновлённая категория" in client.get("/").content.decode(), (
+        "Убедитесь, что закешированная карточка публикации обновляется"
+        " после изменения её категории."
+    )
+
+    user.username = "renamed_author"
+    user.save()
+    assert "@renamed_author" in client.get("/").content.decode(), (
+        "Убедитесь, что закешированная карточка публикации обновляется"
+        " после смены имени автора."
+    )
+
+    mixer.blend("blog.Comment", post=post, author=user)
+    assert "Комментарии (1)" in client.get("/").content.decode(), (
+        "Убедитесь, что закешированная карточка публикации обновляется"
+        " после добавления комментария."
+    )
+
+
+@pytest.mark.django_db
+def test_post_card_key_follows_row_version(
+        client, mixer, user, post_with_published_location, monkeypatch
+):
+    from django.core.cache import cache
+
+    from blog.models import Post
+
+    post = post_with_published_location
+    assert "Комментарии (0)" in client.get("/").content.decode()
+    updated_at = Post.objects.get(pk=post.pk).updated_at
+
+    # Другие процессы не удаляют ничего из кеша этого процесса: карточка
+    # должна обновиться только за счёт новой версии строки в ключе.
+    monkeypatch.setattr(cache, "delete", lambda *args, **kwargs: None)
+    monkeypatch.setattr(cache, "delete_many", lambda *args, **kwargs: None)
+    mixer.blend("blog.Comment", post=post, author=user)
+
+    assert Post.objects.get(pk=post.pk).updated_at > updated_at
+    assert "Комментарии (1)" in client.get("/").content.decode(), (
+        "Убедитесь, что ключ кеша карточки включает версию строки"
+        " публикации, а не только её id."
+    )
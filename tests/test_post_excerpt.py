@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+
+
+@pytest.mark.django_db
+def test_excerpt_follows_post_text(post_with_published_location):
+    from blog.models import EXCERPT_WORDS, Post
+
+    post = post_with_published_location
+    post.text = " ".join(f"слово{number}" for number in range(50))
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt.split()[:EXCERPT_WORDS] == [
+        f"слово{number}" for number in range(EXCERPT_WORDS)
+    ], "Убедитесь, что анонс публикации обновляется при сохранении текста."
+    assert post.excerpt.endswith("…")
+
+    post.text = "Короткий текст"
+    post.save(update_fields=["text"])
+    assert Post.objects.get(pk=post.pk).excerpt == "Короткий текст", (
+        "Убедитесь, что анонс сохраняется и при save(update_fields=...)."
+    )
+
+
+@pytest.mark.django_db
+def test_feed_does_not_load_post_text(client, post_with_published_location):
+    post = post_with_published_location
+    post.text = "Начало " + "длинный текст " * 500
+    post.save()
+    queries = []
+
+    def log(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(log):
+        content = client.get("/").content.decode()
+    assert "Начало длинный текст" in content
+    assert not any(
+        '"blog_post"."text"' in sql or '"blog_post"."rendered"' in sql
+        for sql in queries
+    ), "Убедитесь, что лента не загружает полный текст публикаций."
+
+
+@pytest.mark.django_db
+def test_generated_posts_have_excerpts():
+    from blog.dataset import DatasetGenerator
+    from blog.models import Post
+
+    DatasetGenerator(
+        users=2, categories=1, locations=1, posts=5, comments=0
+    ).generate()
+    assert not Post.objects.filter(excerpt="").exists(), (
+        "Убедитесь, что публикации, созданные пакетно, получают анонс."
+    )
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+import pytest
+from django.conf import settings as django_settings
+from django.template import TemplateSyntaxError
+
+
+def test_all_project_templates_precompile():
+    from blog.templating import precompile_templates
+
+    templates_dir = Path(django_settings.TEMPLATES[0]["DIRS"][0])
+    assert precompile_templates() == len(
+        list(templates_dir.rglob("*.html"))
+    ), "Убедитесь, что при запуске компилируются все шаблоны проекта."
+
+
+def test_precompile_fails_fast_on_syntax_error(settings, tmp_path):
+    from blog.templating import precompile_templates
+
+    (tmp_path / "broken.html").write_text("{% if %}", encoding="utf-8")
+    settings.TEMPLATES = [{
+        **settings.TEMPLATES[0], "DIRS": [tmp_path],
+    }]
+    with pytest.raises(TemplateSyntaxError):
+        precompile_templates()
+
+
+def test_production_settings_use_cached_loader():
+    from blogicum import settings_production
+
+    options = settings_production.TEMPLATES[0]["OPTIONS"]
+    assert not settings_production.DEBUG
+    assert not settings_production.TEMPLATES[0]["APP_DIRS"]
+    assert options["loaders"][0][0] == (
+        "django.template.loaders.cached.Loader"
+    ), "Убедитесь, что в боевых настройках включён кеширующий загрузчик."
+    assert settings_production.BLOG_PRECOMPILE_TEMPLATES
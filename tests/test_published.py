@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_scheduled_post_appears_without_restart(
+        client, mixer, user, published_category
+):
+    from blog.models import Post
+
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    assert post not in client.get("/").context["page_obj"]
+    assert post in Post.published.visible_at(
+        post.pub_date + timedelta(seconds=1)
+    )
+
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(hours=1)
+    )
+    assert post in client.get("/").context["page_obj"], (
+        "Убедитесь, что отложенная публикация появляется в ленте, как только"
+        " наступает дата её публикации, без перезапуска сервера."
+    )
+
+
+@override_settings(BLOG_PUBLISHED_NOW_BUCKET=60)
+def test_published_now_is_rounded_to_bucket():
+    from blog.models import published_now
+
+    moment = published_now()
+    assert moment.timestamp() % 60 == 0
+    assert timezone.now() - moment < timedelta(seconds=60)
@@ -0,0 +1,174 @@
+import json
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from PIL import Image
+
+BUDGETS_PATH = Path(__file__).with_name("query_budgets.json")
+# Адреса, которые без параметров запроса не выполняют основную работу
+QUERY_STRINGS = {"blog:search": "q={search_query}"}
+POSTS = 10
+COMMENTS_PER_POST = 50
+
+
+def image_upload():
+    buffer = BytesIO()
+    Image.new("RGB", (8, 8)).save(buffer, format="GIF")
+    return SimpleUploadedFile("budget.gif", buffer.getvalue())
+
+
+def post_form(data):
+    return {
+        "title": "Заголовок", "text": "Текст", "is_published": "on",
+        "pub_date": "2020-01-01 00:00", "category": data["category_id"],
+        "image": image_upload(),
+    }
+
+
+# Данные успешной отправки форм: POST по этим адресам проходит путь записи
+POST_DATA = {
+    "blog:edit_profile": lambda data: {
+        "username": data["username"], "first_name": "Имя",
+        "last_name": "Фамилия",
+    },
+    "blog:create_post": post_form,
+    "blog:edit_post": post_form,
+    "blog:delete_post": lambda data: {},
+    "blog:add_comment": lambda data: {"text": "Новый комментарий"},
+    "blog:edit_comment": lambda data: {"text": "Исправленный комментарий"},
+    "blog:delete_comment": lambda data: {},
+}
+
+
+@contextmanager
+def capture_queries():
+    """Список SQL-запросов, выполненных внутри блока."""
+    queries = []
+
+    def capture(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(capture):
+        yield queries
+
+
+def get_url_names():
+    from blog import urls
+
+    return [f"{urls.app_name}:{pattern.name}" for pattern in urls.urlpatterns]
+
+
+def load_budgets():
+    return json.loads(BUDGETS_PATH.read_text(encoding="utf-8"))
+
+
+@pytest.fixture
+def budget_data(mixer, user, another_user, published_category,
+                published_location):
+    posts = mixer.cycle(POSTS).blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date="2020-01-01T00:00:00Z",
+    )
+    from blog.models import Comment, Post
+
+    # Комментарии создаются одним запросом: сигналы на каждый объект
+    # здесь не нужны, счётчики обновляются отдельно.
+    Comment.objects.bulk_create(
+        Comment(
+            post=post, text=f"Комментарий {number}",
+            author=user if number == 0 else another_user,
+        )
+        for post in posts
+        for number in range(COMMENTS_PER_POST)
+    )
+    Post.objects.update(comment_count=COMMENTS_PER_POST)
+    post = posts[0]
+    return {
+        "post_id": post.id,
+        "category_slug": published_category.slug,
+        "username": user.username,
+        "category_id": published_category.id,
+        "comment_id": post.comments.filter(author=user).get().id,
+        "search_query": post.title.split()[0],
+    }
+
+
+def test_every_blog_url_has_a_budget():
+    budgets = load_budgets()
+    missing = set(get_url_names()) - set(budgets)
+    assert not missing, (
+        f"Задайте в {BUDGETS_PATH.name} бюджет SQL-запросов для"
+        f" адресов: {', '.join(sorted(missing))}."
+    )
+    missing = {name for name in POST_DATA if "post" not in budgets[name]}
+    assert not missing, (
+        f"Задайте в {BUDGETS_PATH.name} бюджет отправки формы (post) для"
+        f" адресов: {', '.join(sorted(missing))}."
+    )
+
+
+def get_path(url_name, budget_data):
+    from blog import urls
+    from django.urls import reverse
+
+    pattern = next(
+        pattern for pattern in urls.urlpatterns
+        if f"{urls.app_name}:{pattern.name}" == url_name
+    )
+    return reverse(url_name, kwargs={
+        param: budget_data[param] for param in pattern.pattern.converters
+    })
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", get_url_names())
+@pytest.mark.parametrize("user_kind", ["anonymous", "authenticated"])
+def test_view_stays_within_query_budget(
+        client, user_client, budget_data, url_name, user_kind
+):
+    budget = load_budgets()[url_name][user_kind]
+    path = get_path(url_name, budget_data)
+    if url_name in QUERY_STRINGS:
+        path += "?" + QUERY_STRINGS[url_name].format(**budget_data)
+    cache.clear()
+    request_client = user_client if user_kind == "authenticated" else client
+
+    with capture_queries() as queries:
+        response = request_client.get(path)
+
+    assert response.status_code < 500
+    assert len(queries) <= budget, (
+        f"Страница {path} ({user_kind}) выполнила {len(queries)} SQL-запросов"
+        f" при бюджете {budget}:\n" + "\n".join(queries)
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", list(POST_DATA))
+def test_form_submission_stays_within_query_budget(
+        settings, tmp_path, user_client, budget_data, url_name
+):
+    settings.MEDIA_ROOT = tmp_path
+    budget = load_budgets()[url_name]["post"]
+    path = get_path(url_name, budget_data)
+    data = POST_DATA[url_name](budget_data)
+    cache.clear()
+
+    with capture_queries() as queries:
+        response = user_client.post(path, data)
+
+    assert response.status_code == 302, (
+        f"Отправка формы на {path} должна пройти успешно, чтобы бюджет"
+        " измерял запись, а не показ ошибок."
+    )
+    assert len(queries) <= budget, (
+        f"Отправка формы на {path} выполнила {len(queries)} SQL-запросов"
+        f" при бюджете {budget}:\n" + "\n".join(queries)
+    )
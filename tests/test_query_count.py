@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+
+def count_detail_queries(client, post):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(f"/posts/{post.id}/")
+    assert response.status_code == 200
+    return len(context)
+
+
+@pytest.mark.django_db
+def test_post_detail_query_count_does_not_grow_with_comments(
+        mixer, user_client, post_with_published_location
+):
+    from blog.views import COMMENTS_PER_PAGE
+
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post)
+    few_comments_queries = count_detail_queries(user_client, post)
+
+    mixer.cycle(COMMENTS_PER_PAGE * 2).blend("blog.Comment", post=post)
+    many_comments_queries = count_detail_queries(user_client, post)
+
+    assert many_comments_queries == few_comments_queries, (
+        "Убедитесь, что число SQL-запросов страницы поста не зависит от"
+        " количества комментариев: авторов комментариев нужно получать"
+        " одним запросом вместе с комментариями."
+    )
+    response = user_client.get(f"/posts/{post.id}/")
+    assert len(response.context["comments"]) == COMMENTS_PER_PAGE, (
+        "Убедитесь, что на странице поста комментарии выводятся порциями"
+        f" по {COMMENTS_PER_PAGE}."
+    )
+
+
+@pytest.mark.django_db
+def test_post_detail_fetches_post_in_one_query(
+        mixer, client, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    assert count_detail_queries(client, post) == 3, (
+        "Убедитесь, что страница поста получает публикацию со связанными"
+        " объектами одним запросом, а комментарии с авторами - вторым"
+        " (третий запрос считает валидаторы ETag / Last-Modified)."
+    )
+
+    post.is_published = False
+    post.save()
+    assert client.get(f"/posts/{post.id}/").status_code == 404
+    assert user_client.get(f"/posts/{post.id}/").status_code == 200, (
+        "Убедитесь, что автор видит свою снятую с публикации запись."
+    )
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_category_page_reuses_cached_category(
+        client, post_with_published_location
+):
+    url = f"/category/{post_with_published_location.category.slug}/"
+    client.get(url)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    category_queries = [
+        query["sql"] for query in context
+        if 'FROM "blog_category"' in query["sql"]
+    ]
+    assert not category_queries, (
+        "Убедитесь, что страница категории берёт саму категорию из кеша"
+        " и не запрашивает её из базы данных повторно."
+    )
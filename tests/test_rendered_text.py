@@ -0,0 +1,78 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_post_and_comment_html_is_stored_on_save(
+        mixer, user, post_with_published_location
+):
+    from blog.rendering import RENDERER_VERSION
+
+    post = post_with_published_location
+    post.text = "<b>Первая</b>\nвторая"
+    post.save()
+    post.refresh_from_db()
+    assert post.rendered == {
+        "version": RENDERER_VERSION,
+        "text": "&lt;b&gt;Первая&lt;/b&gt;<br>вторая",
+    }, (
+        "Убедитесь, что HTML текста публикации сохраняется вместе с версией"
+        " отрисовки."
+    )
+
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    comment.text = "раз\nдва"
+    comment.save(update_fields=["text"])
+    comment.refresh_from_db()
+    assert comment.rendered["text"] == "раз<br>два"
+
+
+@pytest.mark.django_db
+def test_pages_use_stored_html(client, post_with_published_location):
+    from blog.models import Post
+    from blog.rendering import RENDERER_VERSION
+
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(rendered={
+        "version": RENDERER_VERSION, "text": "<i>готовый HTML</i>",
+    })
+    content = client.get(f"/posts/{post.id}/").content.decode()
+    assert "<i>готовый HTML</i>" in content, (
+        "Убедитесь, что страница поста выводит сохранённый HTML текста."
+    )
+
+    Post.objects.filter(pk=post.pk).update(rendered={
+        "version": RENDERER_VERSION - 1, "text": "<i>устаревший</i>",
+    })
+    content = client.get(f"/posts/{post.id}/").content.decode()
+    assert "устаревший" not in content, (
+        "Убедитесь, что HTML устаревшей версии отрисовывается заново."
+    )
+
+
+@pytest.mark.django_db
+def test_rerender_command_updates_stale_rows(
+        mixer, user, post_with_published_location
+):
+    from django.core.management import call_command
+
+    from blog.models import Comment, Post
+    from blog.rendering import RENDERER_VERSION, stale_rendered
+
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    Post.objects.update(rendered={})
+    Comment.objects.update(rendered={"version": RENDERER_VERSION - 1})
+
+    call_command("rerender_texts", dry_run=True, verbosity=0)
+    assert not Comment.objects.filter(
+        rendered__version=RENDERER_VERSION
+    ).exists()
+
+    call_command("rerender_texts", batch_size=2, verbosity=0)
+    for model in (Post, Comment):
+        assert not model.objects.filter(stale_rendered()).exists(), (
+            "Убедитесь, что rerender_texts пересчитывает все устаревшие"
+            " записи."
+        )
+    post.refresh_from_db()
+    assert post.rendered["text"] == post.body_html
@@ -0,0 +1,65 @@
+import re
+
+import pytest
+from django.test import Client
+
+
+@pytest.mark.django_db
+def test_request_metrics_are_recorded_per_view(
+        settings, user, post_with_published_location
+):
+    from blog import metrics
+
+    settings.BLOG_REQUEST_METRICS = True
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    metrics.reset()
+    client = Client()
+    post_id = post_with_published_location.id
+
+    response = client.get(f"/posts/{post_id}/")
+    assert "Server-Timing" not in response, (
+        "Убедитесь, что заголовок Server-Timing не отправляется"
+        " посетителям, не входящим в персонал."
+    )
+    settings.BLOG_SERVER_TIMING_PUBLIC = True
+    response = client.get(f"/posts/{post_id}/")
+    timing = response["Server-Timing"]
+    assert re.search(r'db;dur=[\d.]+;desc="[1-9]\d* SQL"', timing), (
+        "Убедитесь, что заголовок Server-Timing содержит время и число"
+        " SQL-запросов."
+    )
+    assert "tpl;dur=" in timing and "total;dur=" in timing
+    settings.BLOG_SERVER_TIMING_PUBLIC = False
+
+    user.is_staff = True
+    user.save()
+    client.force_login(user)
+    assert "Server-Timing" in client.get(f"/posts/{post_id}/"), (
+        "Убедитесь, что персонал получает заголовок Server-Timing."
+    )
+    response = client.get("/metrics/")
+    assert response.status_code == 200
+    detail = response.json()["views"]["blog:post_detail"]
+    assert detail["requests"] == 3, (
+        "Убедитесь, что метрики копятся по имени представления."
+    )
+    assert detail["queries"]["mean"] > 0
+    assert sum(detail["total_ms"]["buckets"].values()) == 3
+    assert detail["template_ms"]["max"] > 0, (
+        "Убедитесь, что учитывается время рендеринга шаблонов."
+    )
+
+
+@pytest.mark.django_db
+def test_request_metrics_endpoint_is_private(settings, user_client):
+    settings.BLOG_REQUEST_METRICS = True
+    assert user_client.get("/metrics/").status_code == 403, (
+        "Убедитесь, что метрики запросов доступны только персоналу."
+    )
+
+
+@pytest.mark.django_db
+def test_request_metrics_disabled_by_default(client):
+    response = client.get("/")
+    assert "Server-Timing" not in response
+    assert client.get("/metrics/").status_code == 404
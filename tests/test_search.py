@@ -0,0 +1,89 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_search_finds_visible_posts_with_highlight(
+        client, mixer, user, published_category
+):
+    visible = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="Путешествие на Марс", text="Полёт <script> прошёл хорошо.",
+        pub_date="2020-01-01T00:00Z",
+    )
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="Путешествие на Луну", is_published=False,
+        pub_date="2020-01-01T00:00Z",
+    )
+
+    response = client.get("/search/", {"q": "путешествие"})
+    posts = list(response.context["page_obj"])
+    assert posts == [visible], (
+        "Убедитесь, что поиск находит публикации по словам из заголовка"
+        " и соблюдает те же правила видимости, что и лента."
+    )
+    content = response.content.decode()
+    assert "<mark>" in content, (
+        "Убедитесь, что совпадения в результатах поиска подсвечиваются."
+    )
+    assert "<script>" not in content
+
+    visible.title = "Прогулка"
+    visible.save()
+    response = client.get("/search/", {"q": "путешествие"})
+    assert not list(response.context["page_obj"]), (
+        "Убедитесь, что поисковый индекс обновляется при изменении"
+        " публикации."
+    )
+
+
+@pytest.mark.django_db
+def test_search_ranks_title_matches_first(
+        client, mixer, user, published_category
+):
+    in_text = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="Заметка", text="Немного про вулкан.",
+        pub_date="2021-01-01T00:00Z",
+    )
+    in_title = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        title="Вулкан", text="Извержение.",
+        pub_date="2020-01-01T00:00Z",
+    )
+    response = client.get("/search/", {"q": "вулкан"})
+    assert list(response.context["page_obj"]) == [in_title, in_text]
+
+
+def test_fts5_backend_falls_back_on_other_databases(monkeypatch):
+    from types import SimpleNamespace
+
+    from blog import search
+
+    search.get_search_backend.cache_clear()
+    monkeypatch.setattr(
+        search, "connection", SimpleNamespace(vendor="postgresql")
+    )
+    try:
+        assert isinstance(
+            search.get_search_backend(), search.SimpleSearchBackend
+        ), (
+            "Убедитесь, что вне SQLite вместо FTS5 используется поиск"
+            " без отдельного индекса."
+        )
+    finally:
+        search.get_search_backend.cache_clear()
+
+
+@pytest.mark.django_db
+def test_fts5_search_matches_index_once():
+    from blog.models import Post
+    from blog.search import SQLiteFTS5SearchBackend
+
+    sql = str(SQLiteFTS5SearchBackend().search(
+        Post.objects.all(), "вулкан"
+    ).query)
+    assert sql.count("MATCH") == 1, (
+        "Убедитесь, что поиск присоединяет таблицу индекса один раз, а не"
+        " повторяет MATCH для ранга и фрагмента."
+    )
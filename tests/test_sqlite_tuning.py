@@ -0,0 +1,53 @@
+import sqlite3
+
+import pytest
+from django.db import connection, connections, transaction
+
+
+@pytest.fixture
+def tuned_wrapper(tmp_path, settings):
+    from blogicum.backends.sqlite3.base import DatabaseWrapper
+
+    database = settings.DATABASES["default"]
+    wrapper = DatabaseWrapper({
+        **connection.settings_dict,
+        "NAME": str(tmp_path / "tuned.sqlite3"),
+        "PRAGMAS": database["PRAGMAS"],
+        "TRANSACTION_MODE": database["TRANSACTION_MODE"],
+    }, alias="tuned")
+    connections["tuned"] = wrapper
+    yield wrapper
+    wrapper.close()
+    del connections["tuned"]
+
+
+def pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_sqlite_connection_applies_pragmas(tuned_wrapper):
+    assert pragma(tuned_wrapper, "journal_mode") == "wal", (
+        "Убедитесь, что для SQLite включён журнал WAL."
+    )
+    assert pragma(tuned_wrapper, "synchronous") == 1
+    assert pragma(tuned_wrapper, "busy_timeout") > 0, (
+        "Убедитесь, что соединение SQLite ждёт освобождения блокировки."
+    )
+    assert pragma(tuned_wrapper, "foreign_keys") == 1
+
+
+@pytest.mark.django_db
+def test_sqlite_transactions_take_write_lock_up_front(tuned_wrapper):
+    tuned_wrapper.cursor().execute("CREATE TABLE item (id INTEGER)")
+    other = sqlite3.connect(tuned_wrapper.settings_dict["NAME"], timeout=0)
+    try:
+        with transaction.atomic(using="tuned"):
+            # Транзакция ещё ничего не записала, но блокировка уже взята.
+            tuned_wrapper.cursor().execute("SELECT COUNT(*) FROM item")
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                other.execute("INSERT INTO item VALUES (1)")
+    finally:
+        other.close()
@@ -0,0 +1,101 @@
+import tracemalloc
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http.multipartparser import MultiPartParser
+from django.test import RequestFactory
+from django.test.client import MULTIPART_CONTENT, encode_multipart
+from PIL import Image
+
+
+def make_jpeg(size):
+    buffer = BytesIO()
+    Image.new("RGB", size, color=(73, 109, 137)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+def test_oversized_image_is_rejected_by_upload_handler(
+        user_client, published_category
+):
+    from blog.models import Post
+
+    response = user_client.post("/posts/create/", data={
+        "title": "Огромная картинка",
+        "text": "Текст",
+        "pub_date": "2020-01-01 00:00",
+        "category": published_category.id,
+        "image": SimpleUploadedFile("huge.jpg", make_jpeg((7000, 10))),
+    })
+    assert response.status_code == 200
+    assert "Изображение слишком большое" in response.content.decode(), (
+        "Убедитесь, что изображение с недопустимыми размерами отклоняется"
+        " при загрузке, а причина выводится в форме."
+    )
+    assert not Post.objects.exists()
+
+
+def test_upload_memory_is_bounded(settings):
+    from blog.uploadhandlers import ImageUploadHandler
+    from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+    settings.BLOG_IMAGE_UPLOAD_MAX_SIZE = 64 * 1024 ** 2
+    file_size = 16 * 1024 ** 2
+    payload = make_jpeg((100, 100)) + b"\0" * file_size
+    body = encode_multipart("BoUnDaRy", {
+        "image": SimpleUploadedFile("big.jpg", payload),
+    })
+    request = RequestFactory().post(
+        "/", data=body,
+        content_type=MULTIPART_CONTENT.replace("BoUnDaRyStRiNg", "BoUnDaRy"),
+    )
+    handlers = [
+        ImageUploadHandler(request), TemporaryFileUploadHandler(request)
+    ]
+    stream = BytesIO(body)
+
+    tracemalloc.start()
+    try:
+        _, files = MultiPartParser(
+            request.META, stream, handlers, request.encoding
+        ).parse()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert files["image"].size == len(payload)
+    assert peak < 2 * 1024 ** 2, (
+        f"Загрузка файла в {file_size // 1024 ** 2} МБ заняла {peak} байт"
+        " памяти: убедитесь, что файл пишется на диск порциями."
+    )
+
+
+@pytest.mark.parametrize("size, accepted", [
+    ((100, 100), True),
+    ((7000, 10), False),
+])
+def test_jpeg_with_large_metadata_is_checked(size, accepted):
+    from blog.uploadhandlers import IMAGE_HEADER_LIMIT, ImageUploadHandler
+    from django.core.files.uploadhandler import MemoryFileUploadHandler
+
+    buffer = BytesIO()
+    Image.new("RGB", size).save(
+        buffer, format="JPEG", icc_profile=b"\0" * (2 * IMAGE_HEADER_LIMIT)
+    )
+    body = encode_multipart("BoUnDaRy", {
+        "image": SimpleUploadedFile("photo.jpg", buffer.getvalue()),
+    })
+    request = RequestFactory().post(
+        "/", data=body,
+        content_type=MULTIPART_CONTENT.replace("BoUnDaRyStRiNg", "BoUnDaRy"),
+    )
+    handlers = [ImageUploadHandler(request), MemoryFileUploadHandler(request)]
+    _, files = MultiPartParser(
+        request.META, BytesIO(body), handlers, request.encoding
+    ).parse()
+
+    assert ("image" in files) is accepted, (
+        "Убедитесь, что размеры JPEG проверяются и тогда, когда перед"
+        " заголовком кадра идут большие сегменты EXIF, XMP или ICC."
+    )